@@ -15,6 +15,23 @@ from src.models import BloodPressureReading
 
 logger = logging.getLogger(__name__)
 
+# Columns of uploaded_records that callers may select in get_history()
+RECORD_COLUMNS = (
+    "id",
+    "record_hash",
+    "timestamp",
+    "systolic",
+    "diastolic",
+    "pulse",
+    "irregular_heartbeat",
+    "body_movement",
+    "user_slot",
+    "category",
+    "uploaded_at",
+    "garmin_uploaded",
+    "mqtt_published",
+)
+
 
 class DuplicateFilter:
     """Filter duplicate blood pressure records using SQLite storage.
@@ -33,9 +50,17 @@ class DuplicateFilter:
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection with per-connection settings applied."""
+        conn = sqlite3.connect(self.db_path)
+        # journal_mode=WAL persists in the file (see _init_db); with WAL,
+        # synchronous=NORMAL only fsyncs at checkpoints and is still crash-safe
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
     def _init_db(self) -> None:
         """Initialize database schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute("PRAGMA journal_mode=WAL")
             conn.execute(
                 """
@@ -60,7 +85,28 @@ class DuplicateFilter:
                 "CREATE INDEX IF NOT EXISTS idx_record_hash ON uploaded_records(record_hash)"
             )
             conn.execute("CREATE INDEX IF NOT EXISTS idx_timestamp ON uploaded_records(timestamp)")
-            conn.execute("CREATE INDEX IF NOT EXISTS idx_user_slot ON uploaded_records(user_slot)")
+            # History per user: equality on user_slot, then ordered by timestamp
+            # (scanned backwards for ORDER BY timestamp DESC, no sort step)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_user_timestamp "
+                "ON uploaded_records(user_slot, timestamp)"
+            )
+            # Superseded by idx_user_timestamp (same leading column)
+            conn.execute("DROP INDEX IF EXISTS idx_user_slot")
+            # Partial indexes for get_pending_garmin() / get_pending_mqtt()
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_garmin_pending ON uploaded_records(timestamp) "
+                "WHERE garmin_uploaded = 0"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_mqtt_pending ON uploaded_records(timestamp) "
+                "WHERE mqtt_published = 0"
+            )
+            # Partial index: only the (few) flagged readings, for get_history(flags_only=True)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_flagged ON uploaded_records(timestamp) "
+                "WHERE irregular_heartbeat OR body_movement"
+            )
             conn.commit()
             logger.debug("Database initialized at %s", self.db_path)
 
@@ -73,7 +119,7 @@ class DuplicateFilter:
         Returns:
             True if record exists in database
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 "SELECT 1 FROM uploaded_records WHERE record_hash = ?",
                 (record.record_hash,),
@@ -92,15 +138,11 @@ class DuplicateFilter:
         if not records:
             return []
 
-        # Collect all hashes and query in a single batch
-        hash_to_records: dict[str, BloodPressureReading] = {}
-        for record in records:
-            hash_to_records[record.record_hash] = record
-
-        all_hashes = list(hash_to_records.keys())
+        # Unique hashes (first-seen order), looked up with IN (...) instead of one query each
+        all_hashes = list(dict.fromkeys(record.record_hash for record in records))
         existing_hashes: set[str] = set()
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             # Query in batches of 999 (SQLite variable limit)
             batch_size = 999
             for i in range(0, len(all_hashes), batch_size):
@@ -136,8 +178,46 @@ class DuplicateFilter:
             garmin: Whether uploaded to Garmin
             mqtt: Whether published to MQTT
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
+        self.mark_many([record], garmin=garmin, mqtt=mqtt)
+        logger.debug("Marked record as uploaded: %s", record.record_hash)
+
+    def mark_many(
+        self,
+        records: list[BloodPressureReading],
+        garmin: bool = False,
+        mqtt: bool = False,
+    ) -> None:
+        """Mark several records as uploaded/processed in a single transaction.
+
+        Args:
+            records: Blood pressure readings to mark
+            garmin: Whether uploaded to Garmin
+            mqtt: Whether published to MQTT
+        """
+        if not records:
+            return
+
+        uploaded_at = datetime.now().isoformat()
+        rows = [
+            (
+                record.record_hash,
+                record.timestamp.isoformat(),
+                record.systolic,
+                record.diastolic,
+                record.pulse,
+                record.irregular_heartbeat,
+                record.body_movement,
+                record.user_slot,
+                record.category,
+                uploaded_at,
+                garmin,
+                mqtt,
+            )
+            for record in records
+        ]
+
+        with self._connect() as conn:
+            conn.executemany(
                 """
                 INSERT INTO uploaded_records
                 (record_hash, timestamp, systolic, diastolic, pulse,
@@ -148,23 +228,9 @@ class DuplicateFilter:
                     garmin_uploaded = garmin_uploaded OR excluded.garmin_uploaded,
                     mqtt_published = mqtt_published OR excluded.mqtt_published
                 """,
-                (
-                    record.record_hash,
-                    record.timestamp.isoformat(),
-                    record.systolic,
-                    record.diastolic,
-                    record.pulse,
-                    record.irregular_heartbeat,
-                    record.body_movement,
-                    record.user_slot,
-                    record.category,
-                    datetime.now().isoformat(),
-                    garmin,
-                    mqtt,
-                ),
+                rows,
             )
             conn.commit()
-            logger.debug("Marked record as uploaded: %s", record.record_hash)
 
     def update_upload_status(
         self,
@@ -195,19 +261,66 @@ class DuplicateFilter:
 
         params.append(record.record_hash)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute(
                 f"UPDATE uploaded_records SET {', '.join(updates)} WHERE record_hash = ?",  # nosec B608
                 params,
             )
             conn.commit()
 
+    def _history_query(
+        self,
+        limit: int,
+        user_slot: int | None,
+        start_date: datetime | None,
+        end_date: datetime | None,
+        columns: tuple[str, ...] | None,
+        flags_only: bool,
+    ) -> tuple[str, list]:
+        """Build the SELECT for get_history() / get_history_columns().
+
+        Raises:
+            ValueError: If columns contains an unknown column name
+        """
+        if columns is None:
+            select = "*"
+        else:
+            unknown = set(columns) - set(RECORD_COLUMNS)
+            if unknown:
+                raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+            select = ", ".join(columns)
+
+        query = f"SELECT {select} FROM uploaded_records WHERE 1=1"  # nosec B608
+        params: list = []
+
+        if user_slot is not None:
+            query += " AND user_slot = ?"
+            params.append(user_slot)
+
+        if start_date is not None:
+            query += " AND timestamp >= ?"
+            params.append(start_date.isoformat())
+
+        if end_date is not None:
+            query += " AND timestamp <= ?"
+            params.append(end_date.isoformat())
+
+        if flags_only:
+            # Must match the idx_flagged predicate for SQLite to use the index
+            query += " AND (irregular_heartbeat OR body_movement)"
+
+        query += " ORDER BY timestamp DESC LIMIT ?"
+        params.append(limit)
+        return query, params
+
     def get_history(
         self,
         limit: int = 100,
         user_slot: int | None = None,
         start_date: datetime | None = None,
         end_date: datetime | None = None,
+        columns: tuple[str, ...] | None = None,
+        flags_only: bool = False,
     ) -> list[dict]:
         """Get history of uploaded records.
 
@@ -216,108 +329,126 @@ class DuplicateFilter:
             user_slot: Filter by user slot (1 or 2)
             start_date: Filter records after this date
             end_date: Filter records before this date
+            columns: Columns to return (see RECORD_COLUMNS), None for all
+            flags_only: Only records with irregular heartbeat or body movement
 
         Returns:
             List of record dictionaries
+
+        Raises:
+            ValueError: If columns contains an unknown column name
         """
-        query = "SELECT * FROM uploaded_records WHERE 1=1"
-        params: list = []
+        query, params = self._history_query(
+            limit, user_slot, start_date, end_date, columns, flags_only
+        )
 
-        if user_slot is not None:
-            query += " AND user_slot = ?"
-            params.append(user_slot)
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
 
-        if start_date is not None:
-            query += " AND timestamp >= ?"
-            params.append(start_date.isoformat())
+    def get_history_columns(
+        self,
+        limit: int = 100,
+        user_slot: int | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+        columns: tuple[str, ...] | None = None,
+        flags_only: bool = False,
+    ) -> dict[str, list]:
+        """Get history of uploaded records in column-oriented form.
 
-        if end_date is not None:
-            query += " AND timestamp <= ?"
-            params.append(end_date.isoformat())
+        Same filters and ordering as get_history(), but returns one list per
+        column, which DataFrames are built from without per-row dicts.
 
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
+        Returns:
+            Dictionary mapping column name to its values, most recent first
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        Raises:
+            ValueError: If columns contains an unknown column name
+        """
+        query, params = self._history_query(
+            limit, user_slot, start_date, end_date, columns, flags_only
+        )
+
+        with self._connect() as conn:
             cursor = conn.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+            rows = cursor.fetchall()
+            names = [description[0] for description in cursor.description]
+
+        if not rows:
+            return {name: [] for name in names}
+        return {name: list(values) for name, values in zip(names, zip(*rows))}
 
-    def get_statistics(self, user_slot: int | None = None) -> dict:
+    def get_statistics(
+        self,
+        user_slot: int | None = None,
+        start_date: datetime | None = None,
+        end_date: datetime | None = None,
+    ) -> dict:
         """Get statistics about stored records.
 
+        All values are computed by a single aggregate query, so no rows
+        are transferred out of SQLite.
+
         Args:
             user_slot: Filter by user slot (1 or 2)
+            start_date: Only include records after this date
+            end_date: Only include records before this date
 
         Returns:
             Dictionary with statistics
         """
-        where_clause = ""
+        conditions: list[str] = []
         params: list = []
 
         if user_slot is not None:
-            where_clause = "WHERE user_slot = ?"
+            conditions.append("user_slot = ?")
             params.append(user_slot)
 
-        with sqlite3.connect(self.db_path) as conn:
-            # Total count
-            # Note: where_clause is built from controlled values, not user input
-            cursor = conn.execute(
-                f"SELECT COUNT(*) FROM uploaded_records {where_clause}",  # nosec B608
-                params,
-            )
-            total_count = cursor.fetchone()[0]
+        if start_date is not None:
+            conditions.append("timestamp >= ?")
+            params.append(start_date.isoformat())
 
-            # Garmin uploaded count
-            garmin_where = (
-                f"{where_clause} {'AND' if where_clause else 'WHERE'} garmin_uploaded = 1"
-            )
-            cursor = conn.execute(
-                f"SELECT COUNT(*) FROM uploaded_records {garmin_where}",  # nosec B608
-                params,
-            )
-            garmin_count = cursor.fetchone()[0]
+        if end_date is not None:
+            conditions.append("timestamp <= ?")
+            params.append(end_date.isoformat())
 
-            # MQTT published count
-            mqtt_where = f"{where_clause} {'AND' if where_clause else 'WHERE'} mqtt_published = 1"
-            cursor = conn.execute(
-                f"SELECT COUNT(*) FROM uploaded_records {mqtt_where}",  # nosec B608
-                params,
-            )
-            mqtt_count = cursor.fetchone()[0]
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-            # Date range
-            cursor = conn.execute(
-                f"SELECT MIN(timestamp), MAX(timestamp) FROM uploaded_records {where_clause}",  # nosec B608
-                params,
-            )
-            row = cursor.fetchone()
-            first_record = row[0]
-            last_record = row[1]
-
-            # Average values
+        with self._connect() as conn:
+            # Note: where_clause is built from controlled values, not user input
             cursor = conn.execute(
                 f"""
                 SELECT
-                    AVG(systolic) as avg_systolic,
-                    AVG(diastolic) as avg_diastolic,
-                    AVG(pulse) as avg_pulse
+                    COUNT(*),
+                    COALESCE(SUM(garmin_uploaded = 1), 0),
+                    COALESCE(SUM(mqtt_published = 1), 0),
+                    COALESCE(SUM(irregular_heartbeat = 1), 0),
+                    COALESCE(SUM(body_movement = 1), 0),
+                    MIN(timestamp),
+                    MAX(timestamp),
+                    AVG(systolic),
+                    AVG(diastolic),
+                    AVG(pulse)
                 FROM uploaded_records {where_clause}
                 """,  # nosec B608
                 params,
             )
             row = cursor.fetchone()
 
-            return {
-                "total_records": total_count,
-                "garmin_uploaded": garmin_count,
-                "mqtt_published": mqtt_count,
-                "first_record": first_record,
-                "last_record": last_record,
-                "avg_systolic": round(row[0], 1) if row[0] else None,
-                "avg_diastolic": round(row[1], 1) if row[1] else None,
-                "avg_pulse": round(row[2], 1) if row[2] else None,
-            }
+        return {
+            "total_records": row[0],
+            "garmin_uploaded": row[1],
+            "mqtt_published": row[2],
+            "irregular_heartbeat": row[3],
+            "body_movement": row[4],
+            "first_record": row[5],
+            "last_record": row[6],
+            "avg_systolic": round(row[7], 1) if row[7] else None,
+            "avg_diastolic": round(row[8], 1) if row[8] else None,
+            "avg_pulse": round(row[9], 1) if row[9] else None,
+        }
 
     def get_pending_garmin(self, limit: int = 100) -> list[dict]:
         """Get records not yet uploaded to Garmin.
@@ -328,7 +459,7 @@ class DuplicateFilter:
         Returns:
             List of pending record dictionaries
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
                 """
@@ -350,7 +481,7 @@ class DuplicateFilter:
         Returns:
             List of pending record dictionaries
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.row_factory = sqlite3.Row
             cursor = conn.execute(
                 """
@@ -363,6 +494,25 @@ class DuplicateFilter:
             )
             return [dict(row) for row in cursor.fetchall()]
 
+    def get_pending_counts(self) -> dict[str, int]:
+        """Count records not yet uploaded to Garmin / published to MQTT.
+
+        Unlike len(get_pending_*()), this is not capped by a row limit.
+
+        Returns:
+            Dictionary with 'garmin' and 'mqtt' pending counts
+        """
+        with self._connect() as conn:
+            garmin, mqtt = conn.execute(
+                """
+                SELECT
+                    COALESCE(SUM(garmin_uploaded = 0), 0),
+                    COALESCE(SUM(mqtt_published = 0), 0)
+                FROM uploaded_records
+                """
+            ).fetchone()
+            return {"garmin": garmin, "mqtt": mqtt}
+
     def delete_old_records(self, days: int = 365) -> int:
         """Delete records older than specified days.
 
@@ -376,7 +526,7 @@ class DuplicateFilter:
             days=days
         )
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute(
                 "DELETE FROM uploaded_records WHERE timestamp < ?",
                 (cutoff_date.isoformat(),),
@@ -395,7 +545,7 @@ class DuplicateFilter:
         Returns:
             Number of deleted records
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("DELETE FROM uploaded_records")
             deleted = cursor.rowcount
             conn.commit()
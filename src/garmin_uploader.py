@@ -5,6 +5,7 @@ with duplicate detection both locally (SQLite) and remotely (Garmin API).
 """
 
 import logging
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -77,11 +78,16 @@ def get_token_status(tokens_path: Path, email: str) -> dict:
     return result
 
 
-def list_available_tokens(tokens_path: Path) -> list[dict]:
+def list_available_tokens(
+    tokens_path: Path,
+    status_fn: Callable[[Path, str], dict] = get_token_status,
+) -> list[dict]:
     """List all available token directories with their status.
 
     Args:
         tokens_path: Base path to tokens directory
+        status_fn: Callable returning the status dict for (tokens_path, email),
+            e.g. a cached wrapper around get_token_status
 
     Returns:
         List of dicts with email and status info
@@ -94,7 +100,7 @@ def list_available_tokens(tokens_path: Path) -> list[dict]:
         if item.is_dir() and "_at_" in item.name:
             # Convert folder name back to email
             email = item.name.replace("_at_", "@")
-            status = get_token_status(tokens_path, email)
+            status = status_fn(tokens_path, email)
             status["email"] = email
             results.append(status)
 
@@ -47,6 +47,9 @@ logger = logging.getLogger(__name__)
 # Type alias for sync summary
 SyncSummary = dict[str, Any]
 
+# libyaml's C loader when PyYAML was built with it, pure-Python SafeLoader otherwise
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 # Default configuration
 DEFAULT_CONFIG = {
     "omron": {
@@ -516,10 +519,7 @@ class OmronGarminBridge:
         Returns:
             Dictionary with pending counts
         """
-        return {
-            "garmin": len(self.dup_filter.get_pending_garmin()),
-            "mqtt": len(self.dup_filter.get_pending_mqtt()),
-        }
+        return self.dup_filter.get_pending_counts()
 
     def cleanup(self) -> None:
         """Clean up resources."""
@@ -544,7 +544,7 @@ def load_config(config_path: str | None = None) -> dict:
 
     if config_path and Path(config_path).exists():
         with open(config_path, encoding="utf-8") as f:
-            user_config = yaml.safe_load(f)
+            user_config = yaml.load(f, Loader=YAML_LOADER)  # nosec B506
             if user_config and isinstance(user_config, dict):
                 # Deep merge user config into defaults
                 for section, values in user_config.items():
@@ -1,12 +1,16 @@
 """Data models for Omron Garmin Bridge."""
 
+import functools
 from dataclasses import dataclass
 from datetime import datetime
 
 
-@dataclass
+@dataclass(frozen=True)
 class BloodPressureReading:
-    """Blood pressure measurement from OMRON device."""
+    """Blood pressure measurement from OMRON device.
+
+    Immutable: use dataclasses.replace() to derive a changed reading.
+    """
 
     timestamp: datetime
     systolic: int  # mmHg - systolic pressure
@@ -16,9 +20,9 @@ class BloodPressureReading:
     body_movement: bool = False  # MOV flag
     user_slot: int = 1  # User slot in device (1 or 2)
 
-    @property
+    @functools.cached_property
     def record_hash(self) -> str:
-        """Unique hash for deduplication."""
+        """Unique hash for deduplication (cached; the reading is immutable)."""
         return (
             f"{self.timestamp.isoformat()}_"
             f"{self.systolic}_{self.diastolic}_{self.pulse}_{self.user_slot}"
@@ -3,6 +3,8 @@
 Based on omblepy by userx14 (https://github.com/userx14/omblepy)
 """
 
+import dataclasses
+import functools
 import logging
 from abc import ABC, abstractmethod
 from datetime import datetime
@@ -14,6 +16,12 @@ from src.omron_ble.protocol import OmronBLEProtocol
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=256)
+def _bitfield_params(first_bit: int, last_bit: int, nbytes: int) -> tuple[int, int]:
+    """Get (shift, mask) for bits first_bit..last_bit (MSB = 0) of an nbytes field."""
+    return nbytes * 8 - (last_bit + 1), (1 << (last_bit - first_bit + 1)) - 1
+
+
 class BaseOmronDevice(ABC):
     """Abstract base class for OMRON device drivers.
 
@@ -78,11 +86,8 @@ class BaseOmronDevice(ABC):
         Returns:
             Extracted integer value
         """
-        big_int = int.from_bytes(data, self.device_endianness)
-        num_valid_bits = (last_bit - first_bit) + 1
-        shifted = big_int >> (len(data) * 8 - (last_bit + 1))
-        bitmask = (2**num_valid_bits) - 1
-        return int(shifted & bitmask)
+        shift, mask = _bitfield_params(first_bit, last_bit, len(data))
+        return (int.from_bytes(data, self.device_endianness) >> shift) & mask
 
     async def get_all_records(
         self,
@@ -134,9 +139,10 @@ class BaseOmronDevice(ABC):
                     continue
 
                 try:
-                    reading = self.parse_record(bytes(record_bytes))
-                    # Set user slot (1-indexed)
-                    reading.user_slot = user_idx + 1
+                    # Set user slot (1-indexed); readings are immutable
+                    reading = dataclasses.replace(
+                        self.parse_record(bytes(record_bytes)), user_slot=user_idx + 1
+                    )
                     user_records.append(reading)
                 except Exception as e:
                     logger.warning(
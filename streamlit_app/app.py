@@ -22,9 +22,11 @@ st.set_page_config(
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 from src.main import load_config, setup_logging  # noqa: E402
+from streamlit_app.components.icons import load_fontawesome  # noqa: E402
 
 # Setup logging from config (once per session)
 if "logging_configured" not in st.session_state:
@@ -59,6 +61,9 @@ settings = st.Page(
     url_path="settings",
 )
 
+# Font Awesome for all pages — app.py runs before the selected page on every rerun
+load_fontawesome()
+
 # Navigation
 pg = st.navigation([dashboard, history, sync, settings])
 
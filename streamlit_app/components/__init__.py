@@ -1,5 +1,6 @@
 """Streamlit UI components."""
 
+from streamlit_app.components.formatting import FLAG_LABELS, FLAG_MARKUP
 from streamlit_app.components.icons import ICONS, get_bp_category_icon, load_fontawesome
 from streamlit_app.components.version import (
     get_environment,
@@ -9,6 +10,8 @@ from streamlit_app.components.version import (
 )
 
 __all__ = [
+    "FLAG_LABELS",
+    "FLAG_MARKUP",
     "ICONS",
     "get_bp_category_icon",
     "get_environment",
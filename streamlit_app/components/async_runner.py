@@ -0,0 +1,52 @@
+"""Run coroutines from Streamlit scripts on a shared event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Coroutine
+from concurrent.futures import Future
+from typing import Any, TypeVar
+
+import streamlit as st
+
+T = TypeVar("T")
+
+
+@st.cache_resource
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Start the process-wide event loop on a daemon thread."""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="streamlit-asyncio", daemon=True).start()
+    return loop
+
+
+def submit_async(coro: Coroutine[Any, Any, T]) -> Future[T]:
+    """Schedule a coroutine on the shared loop without waiting for it.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        Future to poll (e.g. to update progress) or wait on
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _background_loop())
+
+
+def run_async(coro: Coroutine[Any, Any, T], timeout: float | None = None) -> T:
+    """Run a coroutine on the shared loop and wait for its result.
+
+    Script reruns reuse one long-lived loop instead of creating and
+    closing a new one per button click.
+
+    Args:
+        coro: Coroutine to run
+        timeout: Seconds to wait for the result, None to wait indefinitely
+
+    Returns:
+        The coroutine's result
+
+    Raises:
+        TimeoutError: If the result is not ready within timeout
+    """
+    return submit_async(coro).result(timeout=timeout)
@@ -0,0 +1,308 @@
+"""Bluetooth (BlueZ) helpers for Streamlit UI."""
+
+from __future__ import annotations
+
+import configparser
+import contextlib
+import functools
+import os
+import re
+import shutil
+import subprocess  # nosec B404
+from collections.abc import AsyncIterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import streamlit as st
+
+from streamlit_app.components.async_runner import run_async, submit_async
+
+if TYPE_CHECKING:
+    from dbus_fast.aio import MessageBus
+
+    from src.omron_ble.client import OmronBLEClient
+
+# MAC prefixes of OMRON Healthcare BLE monitors (str.startswith accepts the tuple)
+OMRON_OUIS = ("00:5F:BF",)
+
+# BlueZ keeps one <adapter>/<device>/info file per known device
+BLUEZ_STORAGE = Path("/var/lib/bluetooth")
+
+# info sections that only exist once a device is bonded (BR/EDR and LE keys)
+PAIRING_KEY_SECTIONS = ("LinkKey", "LongTermKey", "PeripheralLongTermKey", "SlaveLongTermKey")
+
+# bluetoothctl output is matched as raw bytes, without decoding it first:
+# "Device <MAC> <name>" lines from `devices Paired`, "Trusted: yes" from `info`
+PAIRED_DEVICE_RE = re.compile(rb"^Device ([0-9A-F:]{17})\b", re.MULTILINE)
+TRUSTED_RE = re.compile(rb"^\s*Trusted:\s*yes", re.MULTILINE)
+
+
+def read_bluez_storage() -> dict[str, dict[str, bool]] | None:
+    """Get paired and trusted status from BlueZ storage files.
+
+    Returns:
+        Status per device MAC, or None if the storage is not readable
+        (it is usually root-only outside the Docker image)
+    """
+    if not os.access(BLUEZ_STORAGE, os.R_OK | os.X_OK):
+        return None
+
+    result: dict[str, dict[str, bool]] = {}
+    for adapter_dir in BLUEZ_STORAGE.iterdir():
+        # Adapter directories can be root-only even when the top level is not;
+        # glob() would skip them silently and report no paired devices
+        if not adapter_dir.is_dir():
+            continue
+        if not os.access(adapter_dir, os.R_OK | os.X_OK):
+            return None
+        for device_dir in adapter_dir.iterdir():
+            if not device_dir.is_dir():
+                continue
+            parser = configparser.ConfigParser(interpolation=None)
+            try:
+                parser.read_string((device_dir / "info").read_text())
+            except FileNotFoundError:
+                continue  # e.g. the adapter's cache directory
+            except (OSError, configparser.Error):
+                return None
+            if any(parser.has_section(section) for section in PAIRING_KEY_SECTIONS):
+                result[device_dir.name] = {
+                    "paired": True,
+                    "trusted": parser.getboolean("General", "Trusted", fallback=False),
+                }
+    return result
+
+
+@contextlib.asynccontextmanager
+async def system_bus() -> AsyncIterator[MessageBus]:
+    """Connect to the D-Bus system bus for the duration of the block.
+
+    Raises:
+        ImportError: If dbus-fast is not installed (it comes with bleak on Linux)
+    """
+    from dbus_fast import BusType
+    from dbus_fast.aio import MessageBus
+
+    bus = await MessageBus(bus_type=BusType.SYSTEM).connect()
+    try:
+        yield bus
+    finally:
+        bus.disconnect()
+
+
+async def bluez_call(
+    bus: MessageBus, path: str, interface: str, member: str, signature: str = "", body: tuple = ()
+) -> list:
+    """Call a bluetoothd D-Bus method.
+
+    Args:
+        bus: Connected system bus
+        path: Object path
+        interface: Interface name
+        member: Method name
+        signature: D-Bus signature of body
+        body: Method arguments
+
+    Returns:
+        Reply body
+
+    Raises:
+        RuntimeError: If bluetoothd returns a D-Bus error
+    """
+    from dbus_fast import Message, MessageType
+
+    reply = await bus.call(
+        Message(
+            destination="org.bluez",
+            path=path,
+            interface=interface,
+            member=member,
+            signature=signature,
+            body=list(body),
+        )
+    )
+    if reply.message_type == MessageType.ERROR:
+        raise RuntimeError(f"{member} failed: {reply.error_name}")
+    return reply.body
+
+
+async def bluez_devices(bus: MessageBus) -> dict[str, dict]:
+    """Get org.bluez.Device1 properties of all known devices with one call.
+
+    Returns:
+        Device1 properties (dbus-fast Variants) per object path
+    """
+    (objects,) = await bluez_call(
+        bus, "/", "org.freedesktop.DBus.ObjectManager", "GetManagedObjects"
+    )
+    return {
+        path: interfaces["org.bluez.Device1"]
+        for path, interfaces in objects.items()
+        if "org.bluez.Device1" in interfaces
+    }
+
+
+async def read_bluez_dbus() -> dict[str, dict[str, bool]]:
+    """Get paired and trusted status from bluetoothd over D-Bus.
+
+    Returns:
+        Status per paired device MAC
+
+    Raises:
+        ImportError: If dbus-fast is not installed
+        RuntimeError: If bluetoothd returns a D-Bus error
+    """
+    async with system_bus() as bus:
+        devices = await bluez_devices(bus)
+    return {
+        device["Address"].value: {"paired": True, "trusted": device["Trusted"].value}
+        for device in devices.values()
+        if device["Paired"].value
+    }
+
+
+async def remove_device_dbus(mac: str) -> None:
+    """Remove a device with its adapter's org.bluez.Adapter1.RemoveDevice.
+
+    Raises:
+        ImportError: If dbus-fast is not installed
+        RuntimeError: If the device is unknown or bluetoothd returns an error
+    """
+    async with system_bus() as bus:
+        for path, device in (await bluez_devices(bus)).items():
+            if device["Address"].value == mac:
+                adapter = device["Adapter"].value
+                await bluez_call(bus, adapter, "org.bluez.Adapter1", "RemoveDevice", "o", (path,))
+                return
+    raise RuntimeError(f"Unknown device {mac}")
+
+
+def remove_device(mac: str) -> None:
+    """Unpair a device over D-Bus, or with bluetoothctl if D-Bus is unavailable.
+
+    Args:
+        mac: Device MAC address
+
+    Raises:
+        RuntimeError: If bluetoothd rejects the removal (e.g. unknown device)
+            or bluetoothctl exits with an error
+    """
+    future = submit_async(remove_device_dbus(mac))
+    try:
+        future.result(timeout=10)
+        return
+    except TimeoutError:
+        # Stop the D-Bus call so it can't act on the device alongside bluetoothctl
+        future.cancel()
+    except (ImportError, OSError):  # nosec B110 - no dbus-fast or system bus
+        pass
+
+    result = subprocess.run(
+        ["bluetoothctl", "remove", mac],  # nosec B603 B607
+        capture_output=True,
+        timeout=10,
+    )
+    if result.returncode != 0:
+        # bluetoothctl reports errors on stdout, e.g. "Device <MAC> not available"
+        lines = result.stdout.decode(errors="replace").strip().splitlines()
+        detail = lines[-1] if lines else f"exit status {result.returncode}"
+        raise RuntimeError(f"bluetoothctl remove failed: {detail}")
+
+
+@functools.lru_cache(maxsize=1)
+def has_bluetoothctl() -> bool:
+    """Check once per process whether bluetoothctl is on PATH."""
+    return shutil.which("bluetoothctl") is not None
+
+
+def bluetoothctl_info(mac: str) -> bytes:
+    """Get raw `bluetoothctl info` output for one device."""
+    return subprocess.run(
+        ["bluetoothctl", "info", mac],  # nosec B603 B607
+        capture_output=True,
+        timeout=5,
+    ).stdout
+
+
+@functools.cache
+def omron_client_class() -> type[OmronBLEClient]:
+    """Import the BLE client (and bleak) on first scan/pair, not on page load."""
+    from src.omron_ble.client import OmronBLEClient
+
+    return OmronBLEClient
+
+
+async def scan_omron_devices(timeout: float = 10.0) -> list[dict[str, str]]:
+    """Scan for advertising OMRON monitors.
+
+    Args:
+        timeout: Scan duration in seconds
+
+    Returns:
+        List of {"name", "mac"} dicts
+    """
+    devices = await omron_client_class().scan_devices(timeout=timeout)
+    return [
+        {"name": d.name, "mac": d.address}
+        for d in devices
+        if d.name and ("BLESmart" in d.name or "OMRON" in d.name)
+    ]
+
+
+async def pair_device(device_model: str, mac_address: str) -> bool:
+    """Connect to a monitor in pairing mode and pair with it.
+
+    Each attempt uses its own client: OmronBLEClient holds the live
+    connection, so it must not be shared between sessions or attempts.
+
+    Args:
+        device_model: OMRON model name (e.g. "HEM-7361T")
+        mac_address: Device MAC address
+
+    Returns:
+        True if pairing successful
+    """
+    client = omron_client_class()(device_model=device_model, mac_address=mac_address)
+    try:
+        await client.connect(pairing_mode=True)
+        return await client.pair()
+    finally:
+        await client.disconnect()
+
+
+# Get paired/trusted devices. Cached briefly: every widget interaction
+# reruns the page, and the bluetoothctl fallback spawns processes.
+@st.cache_data(ttl=10, show_spinner=False)
+def get_paired_devices() -> dict[str, dict[str, bool]]:
+    """Get paired and trusted status from BlueZ storage, D-Bus, or bluetoothctl."""
+    stored = read_bluez_storage()
+    if stored is not None:
+        return stored
+    try:
+        return run_async(read_bluez_dbus(), timeout=5)
+    except Exception:  # nosec B110 - no dbus-fast, system bus or bluetoothd
+        pass
+    if not has_bluetoothctl():
+        return {}
+
+    result: dict[str, dict[str, bool]] = {}
+    try:
+        # Get paired devices
+        paired_output = subprocess.run(
+            ["bluetoothctl", "devices", "Paired"],  # nosec B603 B607
+            capture_output=True,
+            timeout=5,
+        )
+        for mac in PAIRED_DEVICE_RE.findall(paired_output.stdout):
+            result[mac.decode()] = {"paired": True, "trusted": False}
+
+        # Check trusted status for each paired device, one process per device in parallel
+        if result:
+            with ThreadPoolExecutor(max_workers=min(8, len(result))) as executor:
+                for mac, info in zip(result, executor.map(bluetoothctl_info, list(result))):
+                    if TRUSTED_RE.search(info):
+                        result[mac]["trusted"] = True
+    except Exception:  # nosec B110
+        pass
+    return result
@@ -0,0 +1,100 @@
+"""config.yaml access helpers for Streamlit UI."""
+
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import streamlit as st
+
+# streamlit_app/components -> root
+CONFIG_PATH = Path(__file__).parent.parent.parent / "config" / "config.yaml"
+EXAMPLE_CONFIG_PATH = CONFIG_PATH.with_name("config.yaml.example")
+
+# Device models offered by the Settings and Sync pages, and their selectbox index
+DEVICE_MODELS = ("HEM-7361T", "HEM-7155T", "HEM-7322T", "HEM-7600T", "HEM-7530T")
+DEVICE_MODEL_INDEX = {model: i for i, model in enumerate(DEVICE_MODELS)}
+
+
+@st.cache_data(show_spinner=False)
+def _read_yaml(path: str, mtime_ns: int) -> tuple[str, dict[str, Any]]:  # noqa: ARG001  # cache key
+    """Read and parse a YAML file; mtime_ns is part of the cache key so edits reload it."""
+    import yaml
+
+    text = Path(path).read_text()
+    # libyaml's C loader when available, pure-Python SafeLoader otherwise
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return text, yaml.load(text, Loader=loader) or {}  # nosec B506
+
+
+def load_config_file(path: Path = CONFIG_PATH) -> dict[str, Any]:
+    """Load config.yaml, parsed at most once per file modification.
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        Parsed configuration (a fresh copy), empty dict if the file is missing
+    """
+    if not path.exists():
+        return {}
+    return _read_yaml(str(path), path.stat().st_mtime_ns)[1]
+
+
+def load_config_text(path: Path = CONFIG_PATH) -> str:
+    """Get the raw text of config.yaml from the same cache as load_config_file().
+
+    Args:
+        path: Path to the YAML file
+
+    Returns:
+        File contents, empty string if the file is missing
+    """
+    if not path.exists():
+        return ""
+    return _read_yaml(str(path), path.stat().st_mtime_ns)[0]
+
+
+def save_config_file(config: dict[str, Any], path: Path = CONFIG_PATH) -> None:
+    """Write configuration to a YAML file and drop the cached parse.
+
+    The file is written to a uniquely named temporary file next to the target
+    and renamed over it, so a failed write never leaves a truncated config.yaml
+    behind and concurrent saves don't share a temporary file.
+
+    Args:
+        config: Configuration to write
+        path: Path to the YAML file
+    """
+    import yaml
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as f:
+        tmp_path = Path(f.name)
+    try:
+        # Keep the original permissions: config.yaml holds the MQTT password
+        if path.exists():
+            os.chmod(tmp_path, stat.S_IMODE(path.stat().st_mode))
+        # Binary stream: the emitter writes encoded bytes directly instead of via a text wrapper
+        with open(tmp_path, "wb") as f:
+            yaml.dump(
+                config,
+                f,
+                Dumper=dumper,
+                encoding="utf-8",
+                default_flow_style=False,
+                sort_keys=False,
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        # No-op after a successful replace; removes the leftover after a failure
+        tmp_path.unlink(missing_ok=True)
+    _read_yaml.clear()
@@ -0,0 +1,100 @@
+"""Database access helpers for Streamlit UI."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import streamlit as st
+
+from src.duplicate_filter import DuplicateFilter
+
+# streamlit_app/components -> root
+DB_PATH = Path(__file__).parent.parent.parent / "data" / "omron.db"
+
+
+@st.cache_resource
+def get_db() -> DuplicateFilter:
+    """Get the process-wide database instance.
+
+    DuplicateFilter opens a short-lived connection per call, so a single
+    instance is safe to share between sessions and script threads.
+    """
+    return DuplicateFilter(str(DB_PATH))
+
+
+def date_range(days: int) -> tuple[datetime | None, datetime | None]:
+    """Get (start, end) for the last N days, (None, None) for all time."""
+    if days <= 0:
+        return None, None
+    end_date = datetime.now()
+    return end_date - timedelta(days=days), end_date
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_history(
+    limit: int,
+    user_slot: int | None = None,
+    days: int = 0,
+    columns: tuple[str, ...] | None = None,
+    flags_only: bool = False,
+) -> list[dict]:
+    """Get reading history, cached across Streamlit reruns.
+
+    Widget interactions rerun the whole page, so the query is keyed on the
+    filter values only and refreshed at most once a minute.
+
+    Args:
+        limit: Maximum number of records to return
+        user_slot: Filter by user slot (1 or 2), None for all users
+        days: Only records from the last N days, 0 for all time
+        columns: Columns to select, None for the full record
+        flags_only: Only readings with IHB or MOV flags
+
+    Returns:
+        List of record dictionaries, most recent first
+    """
+    start_date, end_date = date_range(days)
+    return get_db().get_history(
+        limit=limit,
+        user_slot=user_slot,
+        start_date=start_date,
+        end_date=end_date,
+        columns=columns,
+        flags_only=flags_only,
+    )
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_statistics(user_slot: int | None = None, days: int = 0) -> dict:
+    """Get aggregate statistics, cached across Streamlit reruns.
+
+    Aggregates are computed in SQL over the whole date range, independent of
+    how many rows a page displays.
+
+    Args:
+        user_slot: Filter by user slot (1 or 2), None for all users
+        days: Only records from the last N days, 0 for all time
+
+    Returns:
+        Statistics dictionary (see DuplicateFilter.get_statistics)
+    """
+    start_date, end_date = date_range(days)
+    return get_db().get_statistics(user_slot=user_slot, start_date=start_date, end_date=end_date)
+
+
+def invalidate_history_caches() -> None:
+    """Drop cached readings after a sync or upload-status change.
+
+    Only the history caches are cleared; config, token status and other
+    st.cache_data entries stay valid. Chart builders are keyed on the
+    DataFrame they draw, so they need no clearing.
+    """
+    # history_view imports this module, so import it here to avoid a cycle
+    from streamlit_app.components import history_view
+
+    fetch_history.clear()
+    fetch_statistics.clear()
+    history_view.fetch_history_frame.clear()
+    history_view.history_csv.clear()
+    history_view.history_table.clear()
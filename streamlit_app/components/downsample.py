@@ -0,0 +1,88 @@
+"""Time-series downsampling for Plotly charts.
+
+Implements Largest-Triangle-Three-Buckets (LTTB), which keeps the visual
+shape of a line (peaks and dips) while reducing the number of points the
+browser has to draw and hit-test on hover.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Maximum points per trace handed to Plotly
+MAX_CHART_POINTS = 500
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Select indices of points to keep using LTTB.
+
+    Args:
+        x: X values (numeric, sorted ascending)
+        y: Y values
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted array of selected indices (first and last point always kept)
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # n_out - 2 buckets over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Average of the next bucket (or the last point for the final bucket)
+        if i < n_out - 3:
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        # Pick the point forming the largest triangle with a and the next average
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+
+    return selected
+
+
+def downsample(
+    x: pd.Series, *ys: pd.Series, n_out: int = MAX_CHART_POINTS
+) -> tuple[pd.Series, ...]:
+    """Downsample one or more time series that share x values, for display.
+
+    Points are selected from the first series and the same indices are applied
+    to all of them, so traces drawn together (e.g. SYS and DIA) keep identical
+    x values for unified hover.
+
+    Args:
+        x: X values (timestamps or numbers), sorted ascending
+        *ys: Y values; the first series drives point selection
+        n_out: Maximum number of points to keep
+
+    Returns:
+        Tuple of (x, *ys) with at most n_out points each
+    """
+    if len(x) <= n_out:
+        return (x, *ys)
+
+    x_values = x.to_numpy()
+    if np.issubdtype(x_values.dtype, np.datetime64):
+        x_values = x_values.view("int64")
+
+    idx = lttb_indices(x_values, ys[0].to_numpy(dtype=float), n_out)
+    return (x.iloc[idx], *(y.iloc[idx] for y in ys))
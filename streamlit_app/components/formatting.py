@@ -0,0 +1,18 @@
+"""Display formatting helpers for Streamlit UI."""
+
+from __future__ import annotations
+
+from streamlit_app.components.icons import ICONS
+
+# Both flag tables are indexed by (irregular_heartbeat << 1) | body_movement
+
+# Flags column labels for reading tables
+FLAG_LABELS = ("-", "MOV", "IHB", "IHB, MOV")
+
+# Flags markup for the Dashboard's last reading
+FLAG_MARKUP = (
+    "",
+    f"{ICONS['warning']} MOV",
+    f"{ICONS['warning']} IHB",
+    f"{ICONS['warning']} IHB | {ICONS['warning']} MOV",
+)
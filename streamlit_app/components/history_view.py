@@ -0,0 +1,507 @@
+"""Shared data transforms and charts for the Dashboard and History pages."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from streamlit_app.components.database import date_range, get_db
+from streamlit_app.components.downsample import downsample
+from streamlit_app.components.formatting import FLAG_LABELS
+
+# Plotly is imported inside the chart builders: the Dashboard only uses the
+# table helpers, and History returns early when there is nothing to plot.
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Theme-adaptive layout — transparent backgrounds let Streamlit control dark/light
+MEDICAL_LAYOUT = {
+    "font": {"family": "Inter, -apple-system, SF Pro Display, sans-serif", "size": 13},
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    "plot_bgcolor": "rgba(0,0,0,0)",
+    "margin": {"l": 55, "r": 20, "t": 35, "b": 55},
+    "xaxis": {
+        "gridcolor": "rgba(128,128,128,0.15)",
+        "gridwidth": 1,
+        "zeroline": False,
+        "showline": True,
+        "linewidth": 1,
+        "linecolor": "rgba(128,128,128,0.3)",
+        "tickformat": "%b %d",
+        "ticks": "outside",
+        "ticklen": 4,
+    },
+    "yaxis": {
+        "gridcolor": "rgba(128,128,128,0.15)",
+        "gridwidth": 1,
+        "zeroline": False,
+        "showline": True,
+        "linewidth": 1,
+        "linecolor": "rgba(128,128,128,0.3)",
+        "ticks": "outside",
+        "ticklen": 4,
+    },
+    "hoverlabel": {"font_size": 12},
+}
+
+# Passed to st.dataframe with build_readings_table()
+READINGS_COLUMN_CONFIG = {
+    "Date": st.column_config.DatetimeColumn("Date", format="DD MMM YYYY, HH:mm"),
+    "Garmin": st.column_config.CheckboxColumn("Garmin", help="Uploaded to Garmin Connect"),
+    "MQTT": st.column_config.CheckboxColumn("MQTT", help="Published to MQTT"),
+}
+
+# Passed to st.plotly_chart; uirevision in each layout keeps zoom/pan across reruns
+PLOTLY_CONFIG = {"responsive": True, "displaylogo": False}
+
+# BP category colors (clinical palette)
+CATEGORY_COLORS = {
+    "optimal": "#10B981",
+    "normal": "#059669",
+    "high_normal": "#D97706",
+    "grade1_hypertension": "#DC2626",
+    "grade2_hypertension": "#B91C1C",
+    "grade3_hypertension": "#991B1B",
+    "unknown": "#9CA3AF",
+}
+
+CATEGORY_ORDER = [
+    "grade3_hypertension",
+    "grade2_hypertension",
+    "grade1_hypertension",
+    "high_normal",
+    "normal",
+    "optimal",
+]
+
+
+# Columns needed to render the readings table
+TABLE_COLUMNS = (
+    "timestamp",
+    "systolic",
+    "diastolic",
+    "pulse",
+    "category",
+    "irregular_heartbeat",
+    "body_movement",
+    "user_slot",
+    "garmin_uploaded",
+    "mqtt_published",
+)
+
+
+# Compact dtypes for history frames: readings fit in int16, flags are 0/1
+# (kept numeric rather than bool so the CSV export still shows 0/1)
+COMPACT_DTYPES = {
+    "systolic": "int16",
+    "diastolic": "int16",
+    "pulse": "int16",
+    "irregular_heartbeat": "int8",
+    "body_movement": "int8",
+    "garmin_uploaded": "int8",
+    "mqtt_published": "int8",
+}
+
+
+def bool_column(df: pd.DataFrame, column: str) -> np.ndarray:
+    """Get a 0/1 flag column as a boolean array (NULL counts as False)."""
+    return df[column].fillna(False).to_numpy(dtype=bool)
+
+
+def history_frame(history: list[dict] | dict[str, list]) -> pd.DataFrame:
+    """Convert database records (rows or columns) into a DataFrame with parsed timestamps."""
+    df = pd.DataFrame(history)
+    if df.empty:
+        return df
+    df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+
+    # NULL flags count as 0 (as in bool_column); readings are NOT NULL
+    dtypes = {c: dtype for c, dtype in COMPACT_DTYPES.items() if c in df.columns}
+    df = df.fillna({c: 0 for c, dtype in dtypes.items() if dtype == "int8"})
+    return df.astype(dtypes)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_history_frame(
+    limit: int,
+    user_slot: int | None = None,
+    days: int = 0,
+    flags_only: bool = False,
+) -> pd.DataFrame:
+    """Get reading history as a DataFrame, cached across Streamlit reruns.
+
+    Keyed on the filter values like fetch_history(), so reruns that only
+    touch other widgets skip the query, DataFrame build and timestamp parse.
+
+    Returns:
+        History frame, most recent first (empty if nothing matches)
+    """
+    start_date, end_date = date_range(days)
+    # Column-oriented result: pandas builds each column directly, no per-row dicts
+    history = get_db().get_history_columns(
+        limit=limit,
+        user_slot=user_slot,
+        start_date=start_date,
+        end_date=end_date,
+        flags_only=flags_only,
+    )
+    return history_frame(history)
+
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def history_csv(
+    limit: int,
+    user_slot: int | None = None,
+    days: int = 0,
+    flags_only: bool = False,
+) -> bytes:
+    """Serialize filtered history for the CSV download button.
+
+    Keyed on the filter values (same as fetch_history_frame()), so reruns
+    neither re-serialize the frame nor hash its contents to find the entry.
+    """
+    df = fetch_history_frame(limit=limit, user_slot=user_slot, days=days, flags_only=flags_only)
+    return df.to_csv(index=False, lineterminator="\n").encode("utf-8")
+
+
+def build_readings_table(
+    df: pd.DataFrame, show_user: bool = False, show_category: bool = False
+) -> pd.DataFrame:
+    """Build the readings table shown by st.dataframe.
+
+    Render with column_config=READINGS_COLUMN_CONFIG.
+
+    Args:
+        df: History frame from history_frame()
+        show_user: Include the User column (for "All users" views)
+        show_category: Include the BP Category column
+
+    Returns:
+        Display-ready DataFrame
+    """
+    # Dates stay datetime64 and are formatted by the frontend (READINGS_COLUMN_CONFIG)
+    columns: dict[str, pd.Series | np.ndarray] = {"Date": df["timestamp"]}
+    if show_user:
+        columns["User"] = df["user_slot"].fillna(1).astype(int)
+    columns.update(
+        {
+            "SYS": df["systolic"],
+            "DIA": df["diastolic"],
+            "Pulse": df["pulse"],
+        }
+    )
+    if show_category:
+        # Only a handful of distinct categories: format each once, then map
+        category = df["category"].fillna("unknown")
+        labels = {c: c.replace("_", " ").title() for c in category.unique()}
+        columns["Category"] = category.map(labels)
+    columns.update(
+        {
+            "Flags": np.asarray(FLAG_LABELS)[
+                bool_column(df, "irregular_heartbeat") * 2 + bool_column(df, "body_movement")
+            ],
+            "Garmin": bool_column(df, "garmin_uploaded"),
+            "MQTT": bool_column(df, "mqtt_published"),
+        }
+    )
+    return pd.DataFrame(columns)
+
+
+@st.cache_data(ttl=60, max_entries=4, show_spinner=False)
+def history_table(
+    limit: int,
+    user_slot: int | None = None,
+    days: int = 0,
+    flags_only: bool = False,
+) -> pd.DataFrame:
+    """Build the History readings table, keyed on the filter values.
+
+    Reruns that don't change the filters (download click, chart zoom)
+    reuse the table instead of rebuilding its columns.
+    """
+    df = fetch_history_frame(limit=limit, user_slot=user_slot, days=days, flags_only=flags_only)
+    return build_readings_table(df, show_category=True)
+
+
+# Figures are cached on the frame contents: reruns triggered by unrelated
+# widgets reuse them instead of rebuilding traces and layout.
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_bp_chart(df_chart: pd.DataFrame, user_slot: int | None) -> go.Figure:
+    """Build blood pressure trend chart with shaded risk zones."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Shaded risk zones — low opacity works in both light and dark mode
+    fig.add_hrect(y0=0, y1=80, fillcolor="#10B981", opacity=0.07, line_width=0)
+    fig.add_hrect(y0=80, y1=90, fillcolor="#10B981", opacity=0.04, line_width=0)
+    fig.add_hrect(y0=120, y1=140, fillcolor="#F59E0B", opacity=0.08, line_width=0)
+    fig.add_hrect(y0=140, y1=220, fillcolor="#EF4444", opacity=0.08, line_width=0)
+
+    # Subtle threshold lines (only 2, not 4)
+    fig.add_hline(y=140, line_dash="dot", line_color="#F87171", line_width=1, opacity=0.5)
+    fig.add_hline(y=90, line_dash="dot", line_color="#F87171", line_width=1, opacity=0.5)
+
+    # get_history() returns rows newest first; reversing is a view, not a sort
+    df_sorted = df_chart.iloc[::-1]
+
+    if user_slot is None:
+        for slot, df_u in df_sorted.groupby("user_slot"):
+            label = f"User {slot}"
+            # One set of indices for both traces, so unified hover lines up
+            bp_x, sys_y, dia_y = downsample(df_u["timestamp"], df_u["systolic"], df_u["diastolic"])
+            fig.add_trace(
+                go.Scattergl(
+                    x=bp_x,
+                    y=sys_y,
+                    name=f"{label} SYS",
+                    mode="lines+markers",
+                    line={"color": "#DC2626", "width": 2.5},
+                    marker={"size": 7, "line": {"width": 1.5, "color": "white"}},
+                    legendgroup=label,
+                )
+            )
+            fig.add_trace(
+                go.Scattergl(
+                    x=bp_x,
+                    y=dia_y,
+                    name=f"{label} DIA",
+                    mode="lines+markers",
+                    line={"color": "#1E40AF", "width": 2, "dash": "dot"},
+                    marker={"size": 5, "symbol": "diamond", "line": {"width": 1, "color": "white"}},
+                    legendgroup=label,
+                )
+            )
+    else:
+        # One set of indices for both traces, so unified hover lines up
+        bp_x, sys_y, dia_y = downsample(
+            df_sorted["timestamp"], df_sorted["systolic"], df_sorted["diastolic"]
+        )
+        fig.add_trace(
+            go.Scattergl(
+                x=bp_x,
+                y=sys_y,
+                name="Systolic",
+                mode="lines+markers",
+                line={"color": "#DC2626", "width": 2.5},
+                marker={"size": 7, "line": {"width": 1.5, "color": "white"}},
+                fill="tonexty" if len(df_sorted) > 2 else None,
+            )
+        )
+        fig.add_trace(
+            go.Scattergl(
+                x=bp_x,
+                y=dia_y,
+                name="Diastolic",
+                mode="lines+markers",
+                line={"color": "#1E40AF", "width": 2, "dash": "dot"},
+                marker={"size": 5, "symbol": "diamond", "line": {"width": 1, "color": "white"}},
+            )
+        )
+
+    fig.update_layout(
+        **MEDICAL_LAYOUT,
+        height=380,
+        uirevision="bp_chart",
+        xaxis_title="",
+        yaxis_title="mmHg",
+        hovermode="x unified",
+        legend={
+            "orientation": "h",
+            "yanchor": "bottom",
+            "y": 1.02,
+            "xanchor": "left",
+            "x": 0,
+            "bgcolor": "rgba(0,0,0,0)",
+            "bordercolor": "rgba(0,0,0,0)",
+            "borderwidth": 0,
+        },
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_pulse_chart(df_chart: pd.DataFrame, user_slot: int | None) -> go.Figure:
+    """Build heart rate trend chart."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Normal range zone
+    fig.add_hrect(y0=60, y1=100, fillcolor="#7C3AED", opacity=0.06, line_width=0)
+    fig.add_hline(y=80, line_dash="dot", line_color="#A5B4FC", line_width=1, opacity=0.3)
+
+    # get_history() returns rows newest first; reversing is a view, not a sort
+    df_sorted = df_chart.iloc[::-1]
+
+    if user_slot is None:
+        for slot, df_u in df_sorted.groupby("user_slot"):
+            pulse_x, pulse_y = downsample(df_u["timestamp"], df_u["pulse"])
+            fig.add_trace(
+                go.Scattergl(
+                    x=pulse_x,
+                    y=pulse_y,
+                    name=f"User {slot}",
+                    mode="lines+markers",
+                    line={"color": "#7C3AED" if slot == 1 else "#A78BFA", "width": 2.5},
+                    marker={"size": 6, "line": {"width": 1, "color": "white"}},
+                )
+            )
+    else:
+        pulse_x, pulse_y = downsample(df_sorted["timestamp"], df_sorted["pulse"])
+        fig.add_trace(
+            go.Scattergl(
+                x=pulse_x,
+                y=pulse_y,
+                name="Pulse",
+                mode="lines+markers",
+                line={"color": "#7C3AED", "width": 2.5},
+                marker={"size": 6, "line": {"width": 1, "color": "white"}},
+                fill="tozeroy",
+                fillcolor="rgba(124, 58, 237, 0.06)",
+            )
+        )
+
+    fig.update_layout(
+        **MEDICAL_LAYOUT,
+        height=280,
+        uirevision="pulse_chart",
+        xaxis_title="",
+        yaxis_title="BPM",
+        hovermode="x unified",
+        showlegend=user_slot is None,
+        legend={
+            "orientation": "h",
+            "yanchor": "bottom",
+            "y": 1.02,
+            "xanchor": "left",
+            "x": 0,
+        },
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_category_donut(df_chart: pd.DataFrame) -> go.Figure:
+    """Build category distribution donut chart."""
+    import plotly.graph_objects as go
+
+    categories: dict[str, int] = df_chart["category"].fillna("unknown").value_counts().to_dict()
+
+    # Sort by severity order, then any other categories by frequency
+    sorted_cats = [(cat, categories.pop(cat)) for cat in CATEGORY_ORDER if cat in categories]
+    sorted_cats.extend(categories.items())
+
+    labels = [c[0].replace("_", " ").title() for c in sorted_cats]
+    values = [c[1] for c in sorted_cats]
+    colors = [CATEGORY_COLORS.get(c[0], "#9CA3AF") for c in sorted_cats]
+
+    fig = go.Figure(
+        data=[
+            go.Pie(
+                labels=labels,
+                values=values,
+                hole=0.55,
+                marker_colors=colors,
+                textinfo="label+value",
+                textposition="outside",
+                textfont_size=12,
+                pull=[0.02] * len(labels),
+                hovertemplate="<b>%{label}</b><br>%{value} readings (%{percent})<extra></extra>",
+            )
+        ]
+    )
+
+    total = sum(values)
+    fig.add_annotation(
+        text=f"<b>{total}</b><br><span style='font-size:11px;color:#6B7280'>total</span>",
+        x=0.5,
+        y=0.5,
+        font_size=28,
+        showarrow=False,
+    )
+
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        font={"family": "Inter, -apple-system, sans-serif", "size": 12},
+        height=320,
+        uirevision="category_donut",
+        margin={"t": 10, "b": 10, "l": 10, "r": 10},
+        showlegend=False,
+    )
+    return fig
+
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def build_scatter(df_chart: pd.DataFrame) -> go.Figure:
+    """Build SYS vs DIA scatter plot with risk zones."""
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+
+    # Risk zone backgrounds — low opacity for both themes
+    fig.add_shape(
+        type="rect", x0=0, x1=80, y0=0, y1=120, fillcolor="#10B981", opacity=0.07, line_width=0
+    )
+    fig.add_shape(
+        type="rect", x0=80, x1=90, y0=120, y1=140, fillcolor="#F59E0B", opacity=0.08, line_width=0
+    )
+    fig.add_shape(
+        type="rect", x0=90, x1=130, y0=140, y1=220, fillcolor="#EF4444", opacity=0.07, line_width=0
+    )
+
+    # Threshold lines
+    fig.add_hline(y=140, line_dash="dot", line_color="#F87171", line_width=1, opacity=0.4)
+    fig.add_vline(x=90, line_dash="dot", line_color="#F87171", line_width=1, opacity=0.4)
+
+    # Single trace, colored per point by category
+    fig.add_trace(
+        go.Scattergl(
+            x=df_chart["diastolic"],
+            y=df_chart["systolic"],
+            mode="markers",
+            marker={
+                "size": np.maximum(8, df_chart["pulse"] / 8),
+                "color": df_chart["category"].map(CATEGORY_COLORS).fillna("#9CA3AF"),
+                "line": {"width": 1.5, "color": "white"},
+                "opacity": 0.85,
+            },
+            text=df_chart["timestamp"].dt.strftime("%d %b %Y, %H:%M"),
+            customdata=df_chart["pulse"],
+            hovertemplate=(
+                "<b>%{text}</b><br>"
+                "SYS: %{y} mmHg<br>"
+                "DIA: %{x} mmHg<br>"
+                "Pulse: %{customdata} bpm<extra></extra>"
+            ),
+            showlegend=False,
+        )
+    )
+
+    fig.update_layout(
+        font=MEDICAL_LAYOUT["font"],
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        margin=MEDICAL_LAYOUT["margin"],
+        hoverlabel=MEDICAL_LAYOUT["hoverlabel"],
+        height=350,
+        uirevision="scatter",
+        xaxis_title="Diastolic (mmHg)",
+        yaxis_title="Systolic (mmHg)",
+        xaxis={
+            "range": [50, max(df_chart["diastolic"].max() + 15, 110)],
+            "gridcolor": "rgba(128,128,128,0.15)",
+            "showline": True,
+            "linecolor": "rgba(128,128,128,0.3)",
+        },
+        yaxis={
+            "range": [80, max(df_chart["systolic"].max() + 15, 180)],
+            "gridcolor": "rgba(128,128,128,0.15)",
+            "showline": True,
+            "linecolor": "rgba(128,128,128,0.3)",
+        },
+    )
+    return fig
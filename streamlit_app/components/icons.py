@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import streamlit as st
 
-# Font Awesome CSS - load once per page
+# Font Awesome CSS - emitted on every run by app.py
 FA_CSS = """
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.5.1/css/all.min.css">
 <style>
@@ -20,7 +20,12 @@ FA_CSS = """
 
 
 def load_fontawesome() -> None:
-    """Load Font Awesome CSS. Call once per page."""
+    """Load Font Awesome CSS. Called once per run from app.py for all pages.
+
+    Deliberately not guarded by session_state: Streamlit removes elements a
+    rerun doesn't emit again, so skipping it would drop the stylesheet. The
+    browser caches the CDN file, and an unchanged element is not re-sent.
+    """
     st.markdown(FA_CSS, unsafe_allow_html=True)
 
 
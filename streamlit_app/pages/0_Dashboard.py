@@ -16,30 +16,20 @@ import streamlit as st
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-from src.duplicate_filter import DuplicateFilter  # noqa: E402
-from streamlit_app.components.icons import (  # noqa: E402
-    ICONS,
-    get_bp_category_icon,
-    load_fontawesome,
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from streamlit_app.components.database import fetch_history, get_db  # noqa: E402
+from streamlit_app.components.formatting import FLAG_MARKUP  # noqa: E402
+from streamlit_app.components.history_view import (  # noqa: E402
+    READINGS_COLUMN_CONFIG,
+    TABLE_COLUMNS,
+    build_readings_table,
+    history_frame,
 )
+from streamlit_app.components.icons import ICONS, get_bp_category_icon  # noqa: E402
 from streamlit_app.components.version import show_version_footer  # noqa: E402  # type: ignore
 
-# Load Font Awesome
-load_fontawesome()
-
-# Initialize session state
-if "db" not in st.session_state:
-    db_path = project_root / "data" / "omron.db"
-    st.session_state.db = DuplicateFilter(str(db_path))
-
-
-def get_db() -> DuplicateFilter:
-    """Get database instance from session state."""
-    db: DuplicateFilter = st.session_state.db
-    return db
-
 
 def main() -> None:
     """Main application."""
@@ -95,14 +85,15 @@ def main() -> None:
         st.markdown("---")
         st.subheader("Pending Sync")
 
-        pending_garmin = db.get_pending_garmin()
-        pending_mqtt = db.get_pending_mqtt()
+        pending = db.get_pending_counts()
+        pending_garmin = pending["garmin"]
+        pending_mqtt = pending["mqtt"]
 
         col_pg, col_pm = st.columns(2)
         with col_pg:
             if pending_garmin:
                 st.markdown(
-                    f"<span style='color: #ffc107;'>{ICONS['warning']} Garmin: {len(pending_garmin)}</span>",
+                    f"<span style='color: #ffc107;'>{ICONS['warning']} Garmin: {pending_garmin}</span>",
                     unsafe_allow_html=True,
                 )
             else:
@@ -113,7 +104,7 @@ def main() -> None:
         with col_pm:
             if pending_mqtt:
                 st.markdown(
-                    f"<span style='color: #ffc107;'>{ICONS['warning']} MQTT: {len(pending_mqtt)}</span>",
+                    f"<span style='color: #ffc107;'>{ICONS['warning']} MQTT: {pending_mqtt}</span>",
                     unsafe_allow_html=True,
                 )
             else:
@@ -128,8 +119,10 @@ def main() -> None:
     # Main content - Dashboard
     col1, col2 = st.columns(2)
 
+    # One query feeds both the last reading and the recent readings table
+    history = fetch_history(limit=10, user_slot=user_slot, columns=TABLE_COLUMNS)
+
     # Last reading
-    history = db.get_history(limit=1, user_slot=user_slot)
     if history:
         last = history[0]
         with col1:
@@ -145,14 +138,12 @@ def main() -> None:
             st.metric("Pulse", f"{last['pulse']} bpm")
 
             # Flags
-            flags = []
-            if last.get("irregular_heartbeat"):
-                flags.append(f"{ICONS['warning']} IHB")
-            if last.get("body_movement"):
-                flags.append(f"{ICONS['warning']} MOV")
+            ihb = 2 if last.get("irregular_heartbeat") else 0
+            mov = 1 if last.get("body_movement") else 0
+            flags = FLAG_MARKUP[ihb | mov]
             if flags:
                 st.markdown(
-                    f"<div style='color: #ffc107;'>{' | '.join(flags)}</div>",
+                    f"<div style='color: #ffc107;'>{flags}</div>",
                     unsafe_allow_html=True,
                 )
 
@@ -177,38 +168,15 @@ def main() -> None:
     st.markdown("---")
     st.subheader("Recent Readings")
 
-    history = db.get_history(limit=10, user_slot=user_slot)
     if history:
-        # Convert to display format
-        display_data = []
-        for r in history:
-            flags = []
-            if r.get("irregular_heartbeat"):
-                flags.append("IHB")
-            if r.get("body_movement"):
-                flags.append("MOV")
-
-            # Format timestamp
-            ts = datetime.fromisoformat(r["timestamp"])
-            formatted_time = ts.strftime("%d %b %Y, %H:%M")
-
-            row: dict[str, str | int] = {"Date": formatted_time}
-            # Show User column only when "All Users" is selected
-            if user_slot is None:
-                row["User"] = r.get("user_slot", 1)
-            row.update(
-                {
-                    "SYS": r["systolic"],
-                    "DIA": r["diastolic"],
-                    "Pulse": r["pulse"],
-                    "Flags": ", ".join(flags) if flags else "-",
-                    "Garmin": "✓" if r.get("garmin_uploaded") else "✗",
-                    "MQTT": "✓" if r.get("mqtt_published") else "✗",
-                }
-            )
-            display_data.append(row)
-
-        st.dataframe(display_data, width="stretch", hide_index=True)
+        # Show User column only when "All Users" is selected
+        display_data = build_readings_table(history_frame(history), show_user=user_slot is None)
+        st.dataframe(
+            display_data,
+            width="stretch",
+            hide_index=True,
+            column_config=READINGS_COLUMN_CONFIG,
+        )
     else:
         st.write("No readings yet.")
 
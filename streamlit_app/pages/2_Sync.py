@@ -2,54 +2,62 @@
 
 from __future__ import annotations
 
-import asyncio
 import sys
 from pathlib import Path
 from typing import Any
 
 import streamlit as st
-import yaml
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
-
-from src.duplicate_filter import DuplicateFilter  # noqa: E402
-from streamlit_app.components.icons import ICONS, load_fontawesome  # noqa: E402
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from streamlit_app.components.async_runner import run_async  # noqa: E402
+from streamlit_app.components.config import (  # noqa: E402
+    CONFIG_PATH,
+    DEVICE_MODELS,
+    load_config_file,
+    save_config_file,
+)
+from streamlit_app.components.database import get_db, invalidate_history_caches  # noqa: E402
+from streamlit_app.components.icons import ICONS  # noqa: E402
 from streamlit_app.components.version import show_version_footer  # noqa: E402
 
 
 def load_users_config() -> list[dict[str, Any]]:
     """Load users configuration from config.yaml."""
-    config_path = project_root / "config" / "config.yaml"
-    if config_path.exists():
-        with open(config_path) as f:
-            config = yaml.safe_load(f) or {}
-        users: list[dict[str, Any]] = config.get("users", [])
-        return users
-    return []
+    users: list[dict[str, Any]] = load_config_file().get("users", [])
+    return users
+
+
+def format_pending(records: list[dict[str, Any]]) -> str:
+    """Format pending records as one text block, one line per record."""
+    lines = []
+    for r in records:
+        ts = r["timestamp"][:16].replace("T", " ")
+        lines.append(f"{ts} | {r['systolic']}/{r['diastolic']} | {r['pulse']} bpm")
+    return "\n".join(lines)
 
 
 def main() -> None:
     """Sync page."""
-    load_fontawesome()
 
-    # Initialize database for pending counts
-    db_path = project_root / "data" / "omron.db"
-    db = DuplicateFilter(str(db_path))
+    db = get_db()
 
     with st.sidebar:
         # Pending Sync Status
         st.subheader("Pending Sync")
 
-        pending_garmin = db.get_pending_garmin()
-        pending_mqtt = db.get_pending_mqtt()
+        pending = db.get_pending_counts()
+        pending_garmin = pending["garmin"]
+        pending_mqtt = pending["mqtt"]
 
         col_pg, col_pm = st.columns(2)
         with col_pg:
             if pending_garmin:
                 st.markdown(
-                    f"<span style='color: #ffc107;'>{ICONS['warning']} Garmin: {len(pending_garmin)}</span>",
+                    f"<span style='color: #ffc107;'>{ICONS['warning']} Garmin: {pending_garmin}</span>",
                     unsafe_allow_html=True,
                 )
             else:
@@ -60,7 +68,7 @@ def main() -> None:
         with col_pm:
             if pending_mqtt:
                 st.markdown(
-                    f"<span style='color: #ffc107;'>{ICONS['warning']} MQTT: {len(pending_mqtt)}</span>",
+                    f"<span style='color: #ffc107;'>{ICONS['warning']} MQTT: {pending_mqtt}</span>",
                     unsafe_allow_html=True,
                 )
             else:
@@ -89,7 +97,7 @@ def main() -> None:
         )
         device_model = st.selectbox(
             "Device Model",
-            options=["HEM-7361T", "HEM-7155T", "HEM-7322T", "HEM-7600T"],
+            options=DEVICE_MODELS,
             index=0,
         )
 
@@ -137,11 +145,9 @@ def main() -> None:
 
             # Save Settings button
             if st.button("Save Settings", key="save_sync_settings", icon=":material/save:"):
-                # Load current config
-                config_path = project_root / "config" / "config.yaml"
-                if config_path.exists():
-                    with open(config_path) as f:
-                        config = yaml.safe_load(f) or {}
+                # Load current config (cached parse, reloaded if the file changed)
+                if CONFIG_PATH.exists():
+                    config = load_config_file()
 
                     # Update user settings
                     for user in config.get("users", []):
@@ -152,8 +158,7 @@ def main() -> None:
                             user["mqtt_enabled"] = sync_mqtt_users[slot]
 
                     # Save config
-                    with open(config_path, "w") as f:
-                        yaml.dump(config, f, default_flow_style=False, sort_keys=False)
+                    save_config_file(config)
 
                     st.success("Settings saved!")
                 else:
@@ -213,7 +218,7 @@ def main() -> None:
 
             progress_bar.progress(20, text="Loading configuration...")
 
-            config = load_config(str(project_root / "config" / "config.yaml"))
+            config = load_config(str(CONFIG_PATH))
             config["omron"]["mac_address"] = mac_address
             config["omron"]["device_model"] = device_model
 
@@ -229,21 +234,20 @@ def main() -> None:
 
             progress_bar.progress(40, text="Connecting to OMRON...")
 
-            # Run async sync
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                summary = loop.run_until_complete(
-                    bridge.sync(
-                        garmin_enabled=sync_garmin,
-                        mqtt_enabled=sync_mqtt,
-                    )
+            # Run async sync on the shared event loop
+            summary = run_async(
+                bridge.sync(
+                    garmin_enabled=sync_garmin,
+                    mqtt_enabled=sync_mqtt,
                 )
-            finally:
-                loop.close()
+            )
 
             progress_bar.progress(100, text="Done")
 
+            # New readings and upload flags must show up on Dashboard/History now,
+            # not when the cached history expires
+            invalidate_history_caches()
+
             # Check for errors
             if summary.get("errors"):
                 error_msg = summary["errors"][0] if summary["errors"] else "Unknown"
@@ -324,37 +328,34 @@ def main() -> None:
     st.markdown("---")
     st.subheader("Retry Failed Uploads")
 
-    # Refresh pending counts (db already initialized at top)
-    pending_garmin = db.get_pending_garmin()
-    pending_mqtt = db.get_pending_mqtt()
+    # Refresh pending counts (a sync above may have changed them)
+    pending = db.get_pending_counts()
+    pending_garmin = pending["garmin"]
+    pending_mqtt = pending["mqtt"]
 
     if not pending_garmin and not pending_mqtt:
         st.success("All records have been synced successfully!")
     else:
-        st.info(f"**Pending:** {len(pending_garmin)} Garmin, {len(pending_mqtt)} MQTT")
+        st.info(f"**Pending:** {pending_garmin} Garmin, {pending_mqtt} MQTT")
 
         # Show pending records
         if pending_garmin:
-            with st.expander(f"Pending Garmin uploads ({len(pending_garmin)})"):
-                for r in pending_garmin[:10]:  # Show max 10
-                    ts = r["timestamp"][:16].replace("T", " ")
-                    st.text(f"{ts} | {r['systolic']}/{r['diastolic']} | {r['pulse']} bpm")
-                if len(pending_garmin) > 10:
-                    st.caption(f"... and {len(pending_garmin) - 10} more")
+            with st.expander(f"Pending Garmin uploads ({pending_garmin})"):
+                st.text(format_pending(db.get_pending_garmin(limit=10)))  # Show max 10
+                if pending_garmin > 10:
+                    st.caption(f"... and {pending_garmin - 10} more")
 
         if pending_mqtt:
-            with st.expander(f"Pending MQTT publishes ({len(pending_mqtt)})"):
-                for r in pending_mqtt[:10]:  # Show max 10
-                    ts = r["timestamp"][:16].replace("T", " ")
-                    st.text(f"{ts} | {r['systolic']}/{r['diastolic']} | {r['pulse']} bpm")
-                if len(pending_mqtt) > 10:
-                    st.caption(f"... and {len(pending_mqtt) - 10} more")
+            with st.expander(f"Pending MQTT publishes ({pending_mqtt})"):
+                st.text(format_pending(db.get_pending_mqtt(limit=10)))  # Show max 10
+                if pending_mqtt > 10:
+                    st.caption(f"... and {pending_mqtt - 10} more")
 
         col_retry_g, col_retry_m = st.columns(2)
 
         with col_retry_g:
             retry_garmin_btn = st.button(
-                f"Retry Garmin ({len(pending_garmin)})",
+                f"Retry Garmin ({pending_garmin})",
                 disabled=not pending_garmin,
                 type="primary" if pending_garmin else "secondary",
                 key="retry_garmin",
@@ -363,7 +364,7 @@ def main() -> None:
 
         with col_retry_m:
             retry_mqtt_btn = st.button(
-                f"Retry MQTT ({len(pending_mqtt)})",
+                f"Retry MQTT ({pending_mqtt})",
                 disabled=not pending_mqtt,
                 type="primary" if pending_mqtt else "secondary",
                 key="retry_mqtt",
@@ -376,12 +377,13 @@ def main() -> None:
                 try:
                     from src.main import OmronGarminBridge, load_config
 
-                    config = load_config(str(project_root / "config" / "config.yaml"))
+                    config = load_config(str(CONFIG_PATH))
                     bridge = OmronGarminBridge(config)
 
                     if bridge._init_garmin():
                         uploaded, skipped, failed = bridge.retry_pending_garmin()
                         bridge.cleanup()
+                        invalidate_history_caches()
 
                         if uploaded > 0 or skipped > 0:
                             st.success(
@@ -404,12 +406,13 @@ def main() -> None:
                 try:
                     from src.main import OmronGarminBridge, load_config
 
-                    config = load_config(str(project_root / "config" / "config.yaml"))
+                    config = load_config(str(CONFIG_PATH))
                     bridge = OmronGarminBridge(config)
 
                     if bridge._init_mqtt():
                         success, failed = bridge.retry_pending_mqtt()
                         bridge.cleanup()
+                        invalidate_history_caches()
 
                         if success > 0:
                             st.success(f"MQTT: {success} published")
@@ -2,93 +2,258 @@
 
 from __future__ import annotations
 
+import socket
 import sys
+from concurrent.futures import wait
 from pathlib import Path
 
 import streamlit as st
-import yaml
+from garminconnect import Garmin, GarminConnectAuthenticationError
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root))
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
 
 from src.garmin_uploader import get_token_status, list_available_tokens  # noqa: E402
-from streamlit_app.components.icons import ICONS, load_fontawesome  # noqa: E402
+from streamlit_app.components.async_runner import run_async, submit_async  # noqa: E402
+from streamlit_app.components.bluetooth import (  # noqa: E402
+    OMRON_OUIS,
+    get_paired_devices,
+    pair_device,
+    remove_device,
+    scan_omron_devices,
+)
+from streamlit_app.components.config import (  # noqa: E402
+    CONFIG_PATH,
+    DEVICE_MODEL_INDEX,
+    DEVICE_MODELS,
+    EXAMPLE_CONFIG_PATH,
+    load_config_file,
+    load_config_text,
+    save_config_file,
+)
+from streamlit_app.components.icons import ICONS  # noqa: E402
 from streamlit_app.components.version import show_version_footer  # noqa: E402
 
+# BLE scan duration for the Scan button
+SCAN_SECONDS = 10
 
-def main() -> None:
-    """Settings page."""
-    load_fontawesome()
+# User Mapping widget keys (name, email), one pair per OMRON slot (max 2 users)
+USER_KEYS = tuple((f"user_{i}_name", f"user_{i}_email") for i in range(2))
 
-    # Get paired/trusted devices from bluetoothctl
-    def get_paired_devices() -> dict[str, dict[str, bool]]:
-        """Get paired and trusted status from bluetoothctl."""
-        import subprocess  # nosec B404
 
-        result: dict[str, dict[str, bool]] = {}
-        try:
-            # Get paired devices
-            paired_output = subprocess.run(
-                ["bluetoothctl", "devices", "Paired"],  # nosec B603 B607
-                capture_output=True,
-                text=True,
-                timeout=5,
+# Token files only change when a token is generated (here or via the CLI tools)
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_token_status(tokens_dir: str, email: str) -> dict:
+    """Get token status for an email, cached across reruns."""
+    return get_token_status(Path(tokens_dir), email)
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_available_tokens(tokens_dir: str) -> list[dict]:
+    """List available tokens with their status, cached across reruns.
+
+    Each status comes from cached_token_status(), so accounts already checked
+    for Account Status are not logged in to a second time.
+    """
+    return list_available_tokens(
+        Path(tokens_dir), status_fn=lambda path, email: cached_token_status(str(path), email)
+    )
+
+
+# Cached so an unreachable broker doesn't stall every rerun for the timeout
+@st.cache_data(ttl=15, show_spinner=False)
+def test_mqtt_connection(host: str, port: int) -> bool:
+    """Test MQTT broker connection."""
+    try:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(3)
+        result = sock.connect_ex((host, port))
+        sock.close()
+        return result == 0
+    except Exception:
+        return False
+
+
+@st.fragment
+def paired_devices_panel() -> None:
+    """Show paired OMRON devices; Refresh reruns only this fragment."""
+    st.subheader("Bluetooth Pairing")
+    st.markdown("**Paired devices**")
+    paired_status = get_paired_devices()
+    omron_paired = {k: v for k, v in paired_status.items() if k.startswith(OMRON_OUIS)}
+    if omron_paired:
+        for mac, status in omron_paired.items():
+            paired_icon = ICONS["check"] if status["paired"] else ICONS["xmark"]
+            trusted_icon = ICONS["lock"] if status["trusted"] else ICONS["unlock"]
+            st.markdown(
+                f"`{mac}`<br>Paired: {paired_icon} Trusted: {trusted_icon}",
+                unsafe_allow_html=True,
             )
-            for line in paired_output.stdout.strip().split("\n"):
-                if line.startswith("Device "):
-                    parts = line.split(" ", 2)
-                    if len(parts) >= 2:
-                        mac = parts[1]
-                        result[mac] = {"paired": True, "trusted": False}
-
-            # Check trusted status for each paired device
-            for mac in result:
-                info_output = subprocess.run(
-                    ["bluetoothctl", "info", mac],  # nosec B603 B607
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
+    else:
+        st.info("No paired OMRON devices")
+    st.button(
+        "Refresh",
+        key="refresh_paired",
+        icon=":material/refresh:",
+        on_click=get_paired_devices.clear,
+    )
+
+
+@st.fragment
+def mqtt_status_panel(host: str, port: int) -> None:
+    """Show broker reachability; Test now reruns only this fragment."""
+    col_title, col_test = st.columns([4, 1])
+    with col_title:
+        st.markdown("**Broker Status**")
+    with col_test:
+        st.button(
+            "Test now",
+            key="mqtt_test",
+            icon=":material/network_check:",
+            on_click=test_mqtt_connection.clear,
+        )
+    if test_mqtt_connection(host, port):
+        st.success(f"**Connected:** {host}:{port}", icon=":material/check_circle:")
+    else:
+        st.error(f"**Unreachable:** {host}:{port}", icon=":material/error:")
+
+
+def generate_garmin_token(email: str, password: str, tokens_dir: Path) -> tuple[bool, str]:
+    """Generate Garmin OAuth tokens.
+
+    Returns:
+        Tuple of (success, message)
+    """
+    try:
+        # Create user-specific token directory
+        user_folder = email.replace("@", "_at_")
+        user_tokens_dir = tokens_dir / user_folder
+        user_tokens_dir.mkdir(parents=True, exist_ok=True)
+
+        # Login and save tokens
+        garmin = Garmin(email, password)
+        garmin.login()
+        garmin.garth.dump(str(user_tokens_dir))
+
+        # Get display name
+        try:
+            display_name = garmin.display_name
+            return True, f"Token generated for {display_name}"
+        except Exception:
+            return True, f"Token generated for {email}"
+
+    except GarminConnectAuthenticationError as e:
+        return False, f"Authentication failed: {e}"
+    except Exception as e:
+        return False, f"Error: {e}"
+
+
+@st.fragment
+def garmin_account_row(idx: int, user: dict, tokens_dir: Path) -> None:
+    """Show one user's token status and token form.
+
+    Generate/Cancel rerun only this user's row; a generated token reruns
+    the page so the available tokens list picks it up.
+    """
+    user_name = user.get("name", "Unknown")
+    garmin_email = user.get("garmin_email", "")
+    omron_slot = user.get("omron_slot", "?")
+
+    if not garmin_email:
+        st.warning(
+            f"**User {omron_slot} ({user_name}):** No Garmin email configured",
+            icon=":material/warning:",
+        )
+    else:
+        # Check token status
+        token_status = cached_token_status(str(tokens_dir), garmin_email)
+
+        col_status, col_action = st.columns([4, 1])
+
+        with col_status:
+            if token_status["valid"]:
+                display_name = token_status.get("display_name") or garmin_email
+                st.success(
+                    f"**User {omron_slot} ({user_name}):** {display_name}",
+                    icon=":material/check_circle:",
+                )
+            elif token_status["exists"]:
+                st.error(
+                    f"**User {omron_slot} ({user_name}):** Token expired - {garmin_email}",
+                    icon=":material/error:",
+                )
+            else:
+                st.warning(
+                    f"**User {omron_slot} ({user_name}):** No token - {garmin_email}",
+                    icon=":material/warning:",
                 )
-                if "Trusted: yes" in info_output.stdout:
-                    result[mac]["trusted"] = True
-        except Exception:  # nosec B110
-            pass
-        return result
 
+        with col_action:
+            # Generate/Refresh token button
+            button_label = "Refresh" if token_status["exists"] else "Generate"
+            if st.button(
+                button_label,
+                key=f"gen_token_{idx}",
+                icon=":material/refresh:" if token_status["exists"] else ":material/key:",
+            ):
+                st.session_state[f"show_token_form_{idx}"] = True
+
+        # Show token generation form if requested
+        if st.session_state.get(f"show_token_form_{idx}", False):
+            with st.container():
+                st.markdown(f"**Generate token for {garmin_email}**")
+                password = st.text_input(
+                    "Garmin Password",
+                    type="password",
+                    key=f"garmin_pass_{idx}",
+                    help="Your Garmin Connect password (not stored)",
+                )
+
+                col_submit, col_cancel = st.columns(2)
+                with col_submit:
+                    if st.button("Login & Generate", key=f"submit_token_{idx}", type="primary"):
+                        if password:
+                            with st.spinner("Authenticating with Garmin..."):
+                                success, message = generate_garmin_token(
+                                    garmin_email, password, tokens_dir
+                                )
+                            if success:
+                                st.success(message)
+                                cached_token_status.clear()
+                                cached_available_tokens.clear()
+                                st.session_state[f"show_token_form_{idx}"] = False
+                                st.rerun()
+                            else:
+                                st.error(message)
+                        else:
+                            st.error("Password required")
+
+                with col_cancel:
+                    if st.button("Cancel", key=f"cancel_token_{idx}"):
+                        st.session_state[f"show_token_form_{idx}"] = False
+                        st.rerun(scope="fragment")
+
+
+def main() -> None:
+    """Settings page."""
     paired_status = get_paired_devices()
 
     with st.sidebar:
-        st.subheader("Bluetooth Pairing")
-        st.markdown("**Paired devices**")
-        omron_paired = {k: v for k, v in paired_status.items() if k.startswith("00:5F:BF")}
-        if omron_paired:
-            for mac, status in omron_paired.items():
-                paired_icon = ICONS["check"] if status["paired"] else ICONS["xmark"]
-                trusted_icon = ICONS["lock"] if status["trusted"] else ICONS["unlock"]
-                st.markdown(
-                    f"`{mac}`<br>Paired: {paired_icon} Trusted: {trusted_icon}",
-                    unsafe_allow_html=True,
-                )
-        else:
-            st.info("No paired OMRON devices")
+        paired_devices_panel()
         st.markdown("---")
         show_version_footer()
 
     st.markdown(f"# {ICONS['settings']} Settings", unsafe_allow_html=True)
     st.markdown("Configure OMRON Garmin Bridge")
 
-    config_path = project_root / "config" / "config.yaml"
-    example_path = project_root / "config" / "config.yaml.example"
-
-    # Load current config
-    if config_path.exists():
-        with open(config_path) as f:
-            config = yaml.safe_load(f) or {}
+    # Load current config (parsed once per file modification)
+    if CONFIG_PATH.exists():
+        config = load_config_file()
         st.success("Configuration loaded from config/config.yaml")
-    elif example_path.exists():
-        with open(example_path) as f:
-            config = yaml.safe_load(f) or {}
+    elif EXAMPLE_CONFIG_PATH.exists():
+        config = load_config_file(EXAMPLE_CONFIG_PATH)
         st.warning("Using example configuration. Save to create config.yaml")
     else:
         config = {}
@@ -104,10 +269,8 @@ def main() -> None:
     with col1:
         device_model = st.selectbox(
             "Device Model",
-            options=["HEM-7361T", "HEM-7155T", "HEM-7322T", "HEM-7600T", "HEM-7530T"],
-            index=["HEM-7361T", "HEM-7155T", "HEM-7322T", "HEM-7600T", "HEM-7530T"].index(
-                omron_config.get("device_model", "HEM-7361T")
-            ),
+            options=DEVICE_MODELS,
+            index=DEVICE_MODEL_INDEX.get(omron_config.get("device_model", "HEM-7361T"), 0),
         )
         mac_address = st.text_input(
             "MAC Address",
@@ -138,88 +301,74 @@ def main() -> None:
     st.subheader("Bluetooth Pairing")
 
     # Initialize session state for scanned devices
-    if "scanned_devices" not in st.session_state:
-        st.session_state.scanned_devices = []
+    st.session_state.setdefault("scanned_devices", [])
 
     col1, col2 = st.columns(2)
 
     with col1:
         st.markdown("**Scan for devices**")
         if st.button("Scan for OMRON devices", key="scan_btn", icon=":material/search:"):
-            with st.spinner("Scanning for BLE devices (10s)..."):
+            found_devices = None
+            with st.status(f"Scanning for BLE devices ({SCAN_SECONDS}s)...") as scan_status:
                 try:
-                    import asyncio
-
-                    from src.omron_ble.client import OmronBLEClient
-
-                    async def do_scan() -> list[dict[str, str]]:
-                        devices = await OmronBLEClient.scan_devices(timeout=10)
-                        omron_devices = [
-                            d
-                            for d in devices
-                            if d.name and ("BLESmart" in d.name or "OMRON" in d.name)
-                        ]
-                        return [
-                            {"name": d.name or "Unknown", "mac": d.address} for d in omron_devices
-                        ]
-
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        found_devices = loop.run_until_complete(do_scan())
-                    finally:
-                        loop.close()
-
-                    st.session_state.scanned_devices = found_devices
-
-                    if found_devices:
-                        st.success(f"Found {len(found_devices)} device(s)")
+                    # The scan runs on the shared loop; wake up every second to show progress
+                    future = submit_async(scan_omron_devices(timeout=SCAN_SECONDS))
+                    for elapsed in range(1, SCAN_SECONDS + 5):
+                        if wait([future], timeout=1).done:
+                            found_devices = future.result()
+                            scan_status.update(label="Scan finished", state="complete")
+                            break
+                        scan_status.update(label=f"Scanning for BLE devices ({elapsed}s)...")
                     else:
-                        st.warning("No OMRON devices found. Press BT button on device first.")
+                        # Stop the scan so it doesn't keep the adapter busy for the next one
+                        future.cancel()
+                        scan_status.update(label=f"Scan timed out after {elapsed}s", state="error")
                 except Exception as e:
-                    st.error(f"Scan failed: {e}")
-
-        # Show scanned devices
-        if st.session_state.scanned_devices:
-            for idx, dev in enumerate(st.session_state.scanned_devices):
-                status = paired_status.get(dev["mac"], {})
-                is_paired = status.get("paired", False)
-                is_trusted = status.get("trusted", False)
-
-                paired_icon = ICONS["check"] if is_paired else ICONS["xmark"]
-                trusted_icon = ICONS["lock"] if is_trusted else ICONS["unlock"]
-
-                st.markdown(
-                    f"**{dev['name']}**  \n"
-                    f"`{dev['mac']}`  \n"
-                    f"Paired: {paired_icon} | Trusted: {trusted_icon}",
-                    unsafe_allow_html=True,
-                )
+                    scan_status.update(label=f"Scan failed: {e}", state="error")
+
+            if found_devices is not None:
+                st.session_state.scanned_devices = found_devices
+                if found_devices:
+                    st.success(f"Found {len(found_devices)} device(s)")
+                else:
+                    st.warning("No OMRON devices found. Press BT button on device first.")
+
+        # Show scanned devices, collecting the pair selectbox options in the same pass
+        device_options = [""]
+        seen_macs: set[str] = set()
+        for idx, dev in enumerate(st.session_state.scanned_devices):
+            mac = dev["mac"]
+            device_options.append(f"{mac} ({dev['name']})")
+            seen_macs.add(mac)
+
+            status = paired_status.get(mac, {})
+            is_paired = status.get("paired", False)
+            is_trusted = status.get("trusted", False)
+
+            paired_icon = ICONS["check"] if is_paired else ICONS["xmark"]
+            trusted_icon = ICONS["lock"] if is_trusted else ICONS["unlock"]
+
+            st.markdown(
+                f"**{dev['name']}**  \n"
+                f"`{mac}`  \n"
+                f"Paired: {paired_icon} | Trusted: {trusted_icon}",
+                unsafe_allow_html=True,
+            )
 
-                if is_paired and st.button(
-                    "Unpair", key=f"unpair_{idx}", icon=":material/link_off:"
-                ):
-                    import subprocess  # nosec B404
-
-                    try:
-                        subprocess.run(
-                            ["bluetoothctl", "remove", dev["mac"]],  # nosec B603 B607
-                            capture_output=True,
-                            timeout=10,
-                        )
-                        st.success(f"Unpaired {dev['mac']}")
-                        st.rerun()
-                    except Exception as e:
-                        st.error(f"Unpair failed: {e}")
+            if is_paired and st.button("Unpair", key=f"unpair_{idx}", icon=":material/link_off:"):
+                try:
+                    remove_device(mac)
+                    st.success(f"Unpaired {mac}")
+                    get_paired_devices.clear()
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"Unpair failed: {e}")
 
     with col2:
         st.markdown("**Pair device**")
 
-        # Build options from scanned devices
-        device_options = [""] + [
-            f"{d['mac']} ({d['name']})" for d in st.session_state.scanned_devices
-        ]
-        if mac_address and not any(mac_address in opt for opt in device_options):
+        # Options from the scanned devices, plus the configured MAC if not among them
+        if mac_address and mac_address not in seen_macs:
             device_options.append(f"{mac_address} (from config)")
 
         selected_device = st.selectbox(
@@ -240,23 +389,11 @@ def main() -> None:
             )
             with st.spinner("Pairing..."):
                 try:
-                    import asyncio
-
-                    from src.omron_ble.client import OmronBLEClient
-
-                    async def do_pair(mac: str, model: str) -> bool:
-                        client = OmronBLEClient(device_model=model, mac_address=mac)
-                        return await client.pair()
-
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        success = loop.run_until_complete(do_pair(pair_mac, device_model))
-                    finally:
-                        loop.close()
+                    success = run_async(pair_device(device_model, pair_mac))
 
                     if success:
                         st.success(f"Successfully paired with {pair_mac}")
+                        get_paired_devices.clear()
                         st.rerun()
                     else:
                         st.error("Pairing failed. Try again or use CLI.")
@@ -295,123 +432,15 @@ sudo systemctl restart bluetooth""",
 
     st.markdown("**Account Status**")
 
-    # Helper function to generate tokens
-    def generate_garmin_token(email: str, password: str, tokens_dir: Path) -> tuple[bool, str]:
-        """Generate Garmin OAuth tokens.
-
-        Returns:
-            Tuple of (success, message)
-        """
-        from garminconnect import Garmin, GarminConnectAuthenticationError
-
-        try:
-            # Create user-specific token directory
-            user_folder = email.replace("@", "_at_")
-            user_tokens_dir = tokens_dir / user_folder
-            user_tokens_dir.mkdir(parents=True, exist_ok=True)
-
-            # Login and save tokens
-            garmin = Garmin(email, password)
-            garmin.login()
-            garmin.garth.dump(str(user_tokens_dir))
-
-            # Get display name
-            try:
-                display_name = garmin.display_name
-                return True, f"Token generated for {display_name}"
-            except Exception:
-                return True, f"Token generated for {email}"
-
-        except GarminConnectAuthenticationError as e:
-            return False, f"Authentication failed: {e}"
-        except Exception as e:
-            return False, f"Error: {e}"
-
     if not users_config:
         st.info("Configure users in User Mapping section below first.")
     else:
         for idx, user in enumerate(users_config):
-            user_name = user.get("name", "Unknown")
-            garmin_email = user.get("garmin_email", "")
-            omron_slot = user.get("omron_slot", "?")
-
-            if not garmin_email:
-                st.warning(
-                    f"**User {omron_slot} ({user_name}):** No Garmin email configured",
-                    icon=":material/warning:",
-                )
-            else:
-                # Check token status
-                token_status = get_token_status(tokens_dir, garmin_email)
-
-                col_status, col_action = st.columns([4, 1])
-
-                with col_status:
-                    if token_status["valid"]:
-                        display_name = token_status.get("display_name") or garmin_email
-                        st.success(
-                            f"**User {omron_slot} ({user_name}):** {display_name}",
-                            icon=":material/check_circle:",
-                        )
-                    elif token_status["exists"]:
-                        st.error(
-                            f"**User {omron_slot} ({user_name}):** Token expired - {garmin_email}",
-                            icon=":material/error:",
-                        )
-                    else:
-                        st.warning(
-                            f"**User {omron_slot} ({user_name}):** No token - {garmin_email}",
-                            icon=":material/warning:",
-                        )
-
-                with col_action:
-                    # Generate/Refresh token button
-                    button_label = "Refresh" if token_status["exists"] else "Generate"
-                    if st.button(
-                        button_label,
-                        key=f"gen_token_{idx}",
-                        icon=":material/refresh:" if token_status["exists"] else ":material/key:",
-                    ):
-                        st.session_state[f"show_token_form_{idx}"] = True
-
-                # Show token generation form if requested
-                if st.session_state.get(f"show_token_form_{idx}", False):
-                    with st.container():
-                        st.markdown(f"**Generate token for {garmin_email}**")
-                        password = st.text_input(
-                            "Garmin Password",
-                            type="password",
-                            key=f"garmin_pass_{idx}",
-                            help="Your Garmin Connect password (not stored)",
-                        )
-
-                        col_submit, col_cancel = st.columns(2)
-                        with col_submit:
-                            if st.button(
-                                "Login & Generate", key=f"submit_token_{idx}", type="primary"
-                            ):
-                                if password:
-                                    with st.spinner("Authenticating with Garmin..."):
-                                        success, message = generate_garmin_token(
-                                            garmin_email, password, tokens_dir
-                                        )
-                                    if success:
-                                        st.success(message)
-                                        st.session_state[f"show_token_form_{idx}"] = False
-                                        st.rerun()
-                                    else:
-                                        st.error(message)
-                                else:
-                                    st.error("Password required")
-
-                        with col_cancel:
-                            if st.button("Cancel", key=f"cancel_token_{idx}"):
-                                st.session_state[f"show_token_form_{idx}"] = False
-                                st.rerun()
+            garmin_account_row(idx, user, tokens_dir)
 
     # Show all available tokens
     with st.expander("All Available Tokens"):
-        available_tokens = list_available_tokens(tokens_dir)
+        available_tokens = cached_available_tokens(str(tokens_dir))
         if available_tokens:
             for token in available_tokens:
                 status_icon = ICONS["check"] if token["valid"] else ICONS["xmark"]
@@ -444,36 +473,8 @@ pdm run python tools/import_tokens.py""",
     st.subheader("MQTT")
     mqtt_config = config.get("mqtt", {})
 
-    # Test MQTT connection
-    def test_mqtt_connection(host: str, port: int) -> bool:
-        """Test MQTT broker connection."""
-        try:
-            import socket
-
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(3)
-            result = sock.connect_ex((host, port))
-            sock.close()
-            return result == 0
-        except Exception:
-            return False
-
-    mqtt_host_val = mqtt_config.get("host", "192.168.40.19")
-    mqtt_port_val = mqtt_config.get("port", 1883)
-    mqtt_connected = test_mqtt_connection(mqtt_host_val, mqtt_port_val)
-
     # Show connection status (same style as Garmin Account Status)
-    st.markdown("**Broker Status**")
-    if mqtt_connected:
-        st.success(
-            f"**Connected:** {mqtt_host_val}:{mqtt_port_val}",
-            icon=":material/check_circle:",
-        )
-    else:
-        st.error(
-            f"**Unreachable:** {mqtt_host_val}:{mqtt_port_val}",
-            icon=":material/error:",
-        )
+    mqtt_status_panel(mqtt_config.get("host", "192.168.40.19"), mqtt_config.get("port", 1883))
 
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -513,21 +514,22 @@ pdm run python tools/import_tokens.py""",
     if not users_config:
         users_config = [{"name": "User1", "omron_slot": 1, "garmin_email": ""}]
 
-    for i in range(2):  # Max 2 users (OMRON slots 1 and 2)
+    # One row for both slots: name | email | name | email
+    user_cols = st.columns(4)
+    for i, (name_key, email_key) in enumerate(USER_KEYS):
         user = users_config[i] if i < len(users_config) else {}
-        col1, col2 = st.columns(2)
-        with col1:
+        with user_cols[2 * i]:
             st.text_input(
                 f"User {i + 1} - Name",
                 value=user.get("name", ""),
-                key=f"user_{i}_name",
+                key=name_key,
                 help=f"Name for user in OMRON slot {i + 1}",
             )
-        with col2:
+        with user_cols[2 * i + 1]:
             st.text_input(
                 "Garmin Email",
                 value=user.get("garmin_email", ""),
-                key=f"user_{i}_email",
+                key=email_key,
                 help=f"Garmin account email for OMRON slot {i + 1}",
             )
 
@@ -535,6 +537,12 @@ pdm run python tools/import_tokens.py""",
 
     # Save configuration
     if st.button("Save Configuration", type="primary", icon=":material/save:", width="stretch"):
+        # (name, email) per OMRON slot, read from the User Mapping widgets once
+        state = st.session_state
+        user_fields = [
+            (state.get(name_key, ""), state.get(email_key, "")) for name_key, email_key in USER_KEYS
+        ]
+
         # Build new config
         new_config = {
             "omron": {
@@ -545,13 +553,9 @@ pdm run python tools/import_tokens.py""",
                 "sync_time": sync_time,
             },
             "users": [
-                {
-                    "name": st.session_state.get(f"user_{i}_name", ""),
-                    "omron_slot": i + 1,
-                    "garmin_email": st.session_state.get(f"user_{i}_email", ""),
-                }
-                for i in range(2)
-                if st.session_state.get(f"user_{i}_email")
+                {"name": name, "omron_slot": i + 1, "garmin_email": email}
+                for i, (name, email) in enumerate(user_fields)
+                if email
             ],
             "garmin": {
                 "tokens_path": tokens_path,
@@ -576,19 +580,15 @@ pdm run python tools/import_tokens.py""",
             new_config["mqtt"]["password"] = mqtt_password  # type: ignore[index]
 
         # Save to file
-        config_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(config_path, "w") as f:
-            yaml.dump(new_config, f, default_flow_style=False, sort_keys=False)
+        save_config_file(new_config)
 
         st.success("Configuration saved!")
         st.rerun()
 
-    # Show current config (read fresh from file)
+    # Show current config (same cached read as above, refreshed when the file changes)
     with st.expander("View Current Configuration"):
-        if config_path.exists():
-            with open(config_path) as f:
-                current_config = f.read()
-            st.code(current_config, language="yaml")
+        if CONFIG_PATH.exists():
+            st.code(load_config_text(), language="yaml")
         else:
             st.warning("No config.yaml file found")
 
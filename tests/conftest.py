@@ -1,13 +1,16 @@
 """Shared pytest fixtures for omron-garmin-bridge tests."""
 
+import shutil
 from datetime import datetime
 
 import pytest
 
+from src.duplicate_filter import DuplicateFilter
 from src.models import BloodPressureReading
 
 
-@pytest.fixture
+# Reading fixtures are session-scoped: tests must treat them as read-only
+@pytest.fixture(scope="session")
 def sample_reading() -> BloodPressureReading:
     """Create a sample blood pressure reading for testing."""
     return BloodPressureReading(
@@ -21,7 +24,7 @@ def sample_reading() -> BloodPressureReading:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def sample_reading_user2() -> BloodPressureReading:
     """Create a sample reading for user slot 2."""
     return BloodPressureReading(
@@ -35,7 +38,7 @@ def sample_reading_user2() -> BloodPressureReading:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def high_bp_reading() -> BloodPressureReading:
     """Create a high blood pressure reading."""
     return BloodPressureReading(
@@ -49,7 +52,7 @@ def high_bp_reading() -> BloodPressureReading:
     )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def multiple_readings() -> list[BloodPressureReading]:
     """Create multiple readings for testing."""
     return [
@@ -77,7 +80,17 @@ def multiple_readings() -> list[BloodPressureReading]:
     ]
 
 
+@pytest.fixture(scope="session")
+def template_db(tmp_path_factory) -> str:
+    """Create an empty, fully initialized database once per test session."""
+    path = tmp_path_factory.mktemp("template") / "template.db"
+    DuplicateFilter(str(path))
+    return str(path)
+
+
 @pytest.fixture
-def db_path(tmp_path) -> str:
-    """Create a temporary database path for testing."""
-    return str(tmp_path / "test_omron.db")
+def db_path(tmp_path, template_db) -> str:
+    """Create a temporary database for testing, copied from the session template."""
+    path = tmp_path / "test_omron.db"
+    shutil.copyfile(template_db, path)
+    return str(path)
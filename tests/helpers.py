@@ -0,0 +1,17 @@
+"""Shared test helpers (plain module, imported explicitly by test modules)."""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+
+@dataclass(frozen=True, slots=True)
+class MockBloodPressureReading:
+    """Mock BloodPressureReading for the standalone device driver tests."""
+
+    timestamp: datetime
+    systolic: int
+    diastolic: int
+    pulse: int
+    irregular_heartbeat: bool = False
+    body_movement: bool = False
+    user_slot: int = 1
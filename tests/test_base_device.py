@@ -7,26 +7,15 @@ This module tests the base OMRON device driver functionality including:
 - Unread records command generation
 """
 
-from dataclasses import dataclass
 from datetime import datetime
+from types import SimpleNamespace
 from typing import Literal
 
 import pytest
 
-# ============== MOCK CLASSES ==============
-
-
-@dataclass
-class MockBloodPressureReading:
-    """Mock BloodPressureReading for standalone testing."""
+from tests.helpers import MockBloodPressureReading
 
-    timestamp: datetime
-    systolic: int
-    diastolic: int
-    pulse: int
-    irregular_heartbeat: bool = False
-    body_movement: bool = False
-    user_slot: int = 1
+# ============== MOCK CLASSES ==============
 
 
 class ConcreteOmronDevice:
@@ -53,11 +42,9 @@ class ConcreteOmronDevice:
 
     def _extract_bits(self, data: bytes, first_bit: int, last_bit: int) -> int:
         """Extract bits from byte array."""
-        big_int = int.from_bytes(data, self.device_endianness)
-        num_valid_bits = (last_bit - first_bit) + 1
-        shifted = big_int >> (len(data) * 8 - (last_bit + 1))
-        bitmask = (2**num_valid_bits) - 1
-        return int(shifted & bitmask)
+        shift = len(data) * 8 - (last_bit + 1)
+        mask = (1 << (last_bit - first_bit + 1)) - 1
+        return (int.from_bytes(data, self.device_endianness) >> shift) & mask
 
     def _get_all_records_commands(self) -> list[list[dict]]:
         """Get read commands for all records."""
@@ -120,15 +107,21 @@ class ConcreteOmronDevice:
 # ============== FIXTURES ==============
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def device():
-    """Create testable device instance."""
+    """Create testable device instance (shared: tests only read from it)."""
     return ConcreteOmronDevice()
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
+def base_module():
+    """Import the real device driver module (needs bleak)."""
+    return pytest.importorskip("src.omron_ble.devices.base", reason="bleak not installed")
+
+
+@pytest.fixture(scope="module")
 def single_user_device():
-    """Create device with single user slot."""
+    """Create device with single user slot (shared: tests only read from it)."""
     dev = ConcreteOmronDevice()
     dev.user_start_addresses = [0x0100]
     dev.records_per_user = [50]
@@ -153,30 +146,31 @@ class TestDeviceInitialization:
         assert len(device._cached_settings) == 0x54
 
 
+EXTRACT_BITS_CASES = [
+    pytest.param(bytes([0b10000000]), 0, 0, 1, id="single_bit"),
+    pytest.param(bytes([0xAB]), 0, 7, 0xAB, id="full_byte"),
+    pytest.param(bytes([0xF0]), 0, 3, 15, id="nibble"),
+    # Little-endian: 0x3412, first byte is LSB
+    pytest.param(bytes([0x12, 0x34]), 8, 15, 0x12, id="across_bytes"),
+    # Full 16-byte record, systolic field of HEM-7361T (last byte is the MSB)
+    pytest.param(bytes(15) + bytes([0x5F]), 0, 7, 0x5F, id="record_msb"),
+]
+
+
 class TestExtractBits:
     """Tests for _extract_bits method."""
 
-    def test_extract_single_bit(self, device):
-        """Test extracting single bit."""
-        data = bytes([0b10000000])
-        assert device._extract_bits(data, 0, 0) == 1
-
-    def test_extract_full_byte(self, device):
-        """Test extracting full byte."""
-        data = bytes([0xAB])
-        assert device._extract_bits(data, 0, 7) == 0xAB
-
-    def test_extract_nibble(self, device):
-        """Test extracting 4 bits."""
-        data = bytes([0xF0])
-        assert device._extract_bits(data, 0, 3) == 15
-
-    def test_extract_across_bytes(self, device):
-        """Test extracting bits across byte boundary."""
-        data = bytes([0x12, 0x34])  # Little-endian: 0x3412
-        # In little-endian, first byte is LSB
-        result = device._extract_bits(data, 8, 15)
-        assert result == 0x12
+    @pytest.mark.parametrize("data,first_bit,last_bit,expected", EXTRACT_BITS_CASES)
+    def test_extract_bits(self, device, data, first_bit, last_bit, expected):
+        """Test extracting bit ranges."""
+        assert device._extract_bits(data, first_bit, last_bit) == expected
+
+    @pytest.mark.parametrize("data,first_bit,last_bit,expected", EXTRACT_BITS_CASES)
+    def test_base_extract_bits(self, base_module, data, first_bit, last_bit, expected):
+        """Test the real BaseOmronDevice._extract_bits and its cached shift/mask."""
+        device = SimpleNamespace(device_endianness="little")
+        result = base_module.BaseOmronDevice._extract_bits(device, data, first_bit, last_bit)
+        assert result == expected
 
 
 class TestGetAllRecordsCommands:
@@ -232,71 +226,40 @@ class TestGetAllRecordsCommands:
 class TestCalcRingBufferRead:
     """Tests for _calc_ring_buffer_read method."""
 
-    def test_single_read_no_wrap(self, device):
-        """Test single read when no wrap-around needed."""
-        # last_slot=50, unread=10 -> single read from slot 40-50
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=10, last_slot=50)
-        assert len(commands) == 1
-
-    def test_single_read_address(self, device):
-        """Test single read calculates correct address."""
-        # User 0 starts at 0x0098
-        # last_slot=50, unread=10 -> start at slot 40
-        # Address = 0x0098 + 40 * 0x10 = 0x0098 + 0x280 = 0x0318
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=10, last_slot=50)
-        assert commands[0]["address"] == 0x0098 + 40 * 0x10
-
-    def test_single_read_size(self, device):
-        """Test single read calculates correct size."""
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=10, last_slot=50)
-        assert commands[0]["size"] == 10 * 0x10
-
-    def test_wrap_around_two_reads(self, device):
-        """Test wrap-around creates two read commands."""
-        # last_slot=5, unread=20 -> wraps around
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=20, last_slot=5)
-        assert len(commands) == 2
-
-    def test_wrap_around_first_read_from_start(self, device):
-        """Test wrap-around first read starts at buffer beginning."""
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=20, last_slot=5)
-        assert commands[0]["address"] == 0x0098  # User 0 start address
-
-    def test_wrap_around_first_read_size(self, device):
-        """Test wrap-around first read size is last_slot records."""
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=20, last_slot=5)
-        assert commands[0]["size"] == 5 * 0x10
-
-    def test_wrap_around_second_read_address(self, device):
-        """Test wrap-around second read address calculation."""
-        # max_records=100, last_slot=5, unread=20
-        # wrap_addr = start + (100 + 5 - 20) * 16 = start + 85 * 16
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=20, last_slot=5)
-        expected_addr = 0x0098 + 85 * 0x10
-        assert commands[1]["address"] == expected_addr
-
-    def test_wrap_around_second_read_size(self, device):
-        """Test wrap-around second read size is remaining records."""
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=20, last_slot=5)
-        assert commands[1]["size"] == 15 * 0x10  # 20 - 5 = 15 records
-
-    def test_user2_ring_buffer(self, device):
-        """Test ring buffer calculation for user 2."""
-        commands = device._calc_ring_buffer_read(user_idx=1, unread=5, last_slot=10)
-        assert commands[0]["address"] == 0x06D8 + 5 * 0x10
-
-    def test_zero_unread(self, device):
-        """Test zero unread records."""
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=0, last_slot=50)
-        assert len(commands) == 1
-        assert commands[0]["size"] == 0
-
-    def test_all_records_unread(self, device):
-        """Test all records unread (full buffer)."""
-        # last_slot=100, unread=100 -> single read of entire buffer
-        commands = device._calc_ring_buffer_read(user_idx=0, unread=100, last_slot=100)
-        assert len(commands) == 1
-        assert commands[0]["size"] == 100 * 0x10
+    @pytest.mark.parametrize(
+        "user_idx,unread,last_slot,expected",
+        [
+            # last_slot=50, unread=10 -> single read from slot 40
+            # Address = 0x0098 + 40 * 0x10 = 0x0098 + 0x280 = 0x0318
+            pytest.param(
+                0, 10, 50, [{"address": 0x0098 + 40 * 0x10, "size": 10 * 0x10}], id="single_read"
+            ),
+            # last_slot=5, unread=20 -> wraps around: last_slot records from the buffer
+            # start, then the remaining 15 from start + (100 + 5 - 20) * 16
+            pytest.param(
+                0,
+                20,
+                5,
+                [
+                    {"address": 0x0098, "size": 5 * 0x10},
+                    {"address": 0x0098 + 85 * 0x10, "size": 15 * 0x10},
+                ],
+                id="wrap_around",
+            ),
+            pytest.param(1, 5, 10, [{"address": 0x06D8 + 5 * 0x10, "size": 5 * 0x10}], id="user2"),
+            pytest.param(0, 0, 50, [{"address": 0x0098 + 50 * 0x10, "size": 0}], id="zero_unread"),
+            # last_slot=100, unread=100 -> single read of entire buffer
+            pytest.param(
+                0, 100, 100, [{"address": 0x0098, "size": 100 * 0x10}], id="all_records_unread"
+            ),
+        ],
+    )
+    def test_read_commands(self, device, user_idx, unread, last_slot, expected):
+        """Test read commands for unread records in the ring buffer."""
+        commands = device._calc_ring_buffer_read(
+            user_idx=user_idx, unread=unread, last_slot=last_slot
+        )
+        assert commands == expected
 
 
 class TestRingBufferEdgeCases:
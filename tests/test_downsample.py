@@ -0,0 +1,76 @@
+"""Tests for streamlit_app/components/downsample.py - LTTB chart downsampling."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from streamlit_app.components.downsample import downsample, lttb_indices
+
+
+class TestLttbIndices:
+    """Tests for lttb_indices."""
+
+    @pytest.mark.parametrize("n_out", [10, 2, 0], ids=["n_out_ge_n", "n_out_2", "n_out_0"])
+    def test_returns_all_points(self, n_out):
+        """Nothing to reduce, or too few points for LTTB: keep every index."""
+        x = np.arange(10)
+        np.testing.assert_array_equal(lttb_indices(x, x * 2.0, n_out), np.arange(10))
+
+    def test_output_length_and_endpoints(self):
+        """Output should have n_out sorted indices, including first and last."""
+        x = np.arange(1000)
+        y = np.sin(x / 20.0)
+
+        idx = lttb_indices(x, y, 50)
+
+        assert len(idx) == 50
+        assert idx[0] == 0
+        assert idx[-1] == 999
+        assert np.all(np.diff(idx) > 0)
+
+    def test_keeps_spike(self):
+        """A single outlier should survive downsampling."""
+        x = np.arange(500)
+        y = np.full(500, 120.0)
+        y[250] = 200.0
+
+        assert 250 in lttb_indices(x, y, 20)
+
+    def test_duplicate_x_values(self):
+        """Repeated timestamps should still give n_out distinct indices."""
+        x = np.repeat(np.arange(100), 3)
+        y = np.arange(300, dtype=float) % 7
+
+        idx = lttb_indices(x, y, 30)
+
+        assert len(idx) == 30
+        assert np.all(np.diff(idx) > 0)
+
+
+class TestDownsample:
+    """Tests for downsample."""
+
+    def test_short_series_passthrough(self):
+        """Series within the limit should be returned unchanged."""
+        x = pd.Series(pd.date_range("2025-01-01", periods=5, freq="h"))
+        y = pd.Series([120, 125, 130, 118, 122])
+
+        out_x, out_y = downsample(x, y, n_out=10)
+
+        assert out_x is x
+        assert out_y is y
+
+    def test_shared_indices(self):
+        """All series should be reduced at the same points as the first one."""
+        x = pd.Series(pd.date_range("2025-01-01", periods=1000, freq="h"))
+        rng = np.random.default_rng(0)
+        systolic = pd.Series(rng.integers(100, 160, 1000))
+        diastolic = pd.Series(rng.integers(60, 100, 1000))
+
+        out_x, out_sys, out_dia = downsample(x, systolic, diastolic, n_out=100)
+
+        assert len(out_x) == len(out_sys) == len(out_dia) == 100
+        assert out_x.index.equals(out_sys.index)
+        assert out_x.index.equals(out_dia.index)
+        assert out_x.iloc[0] == x.iloc[0]
+        assert out_x.iloc[-1] == x.iloc[-1]
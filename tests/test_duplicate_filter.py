@@ -1,6 +1,8 @@
 """Tests for DuplicateFilter class."""
 
-from datetime import datetime
+from datetime import datetime, timedelta
+
+import pytest
 
 from src.duplicate_filter import DuplicateFilter
 from src.models import BloodPressureReading
@@ -9,9 +11,12 @@ from src.models import BloodPressureReading
 class TestDuplicateFilter:
     """Test suite for DuplicateFilter."""
 
-    def test_init_creates_database(self, db_path):
+    def test_init_creates_database(self, tmp_path):
         """Database should be created on initialization."""
-        filter_instance = DuplicateFilter(db_path)
+        # Fresh path: the db_path fixture is a copy of an already created database
+        db_file = tmp_path / "new.db"
+        assert not db_file.exists()
+        filter_instance = DuplicateFilter(str(db_file))
         assert filter_instance.db_path.exists()
 
     def test_init_creates_parent_directories(self, tmp_path):
@@ -48,6 +53,22 @@ class TestDuplicateFilter:
         assert len(new_records) == len(multiple_readings) - 1
         assert multiple_readings[0] not in new_records
 
+    def test_filter_new_records_spans_query_batches(self, db_path):
+        """Lookups over more than 999 hashes should be split into batches."""
+        filter_instance = DuplicateFilter(db_path)
+        start = datetime(2025, 1, 1, 8, 0, 0)
+        readings = [
+            BloodPressureReading(
+                timestamp=start + timedelta(minutes=i), systolic=120, diastolic=80, pulse=70
+            )
+            for i in range(2500)
+        ]
+        filter_instance.mark_many(readings[::2], garmin=True)
+
+        new_records = filter_instance.filter_new_records(readings + readings[:1])
+
+        assert new_records == readings[1::2]
+
     def test_filter_new_records_empty_list(self, db_path):
         """Empty list should return empty list."""
         filter_instance = DuplicateFilter(db_path)
@@ -100,12 +121,39 @@ class TestDuplicateFilter:
         assert history[0]["garmin_uploaded"] == 1
         assert history[0]["mqtt_published"] == 1
 
+    def test_mark_many_inserts_all(self, db_path, multiple_readings):
+        """mark_many should store every record with the given flags."""
+        filter_instance = DuplicateFilter(db_path)
+
+        filter_instance.mark_many(multiple_readings, garmin=True, mqtt=False)
+
+        assert filter_instance.filter_new_records(multiple_readings) == []
+        assert filter_instance.get_pending_counts() == {"garmin": 0, "mqtt": 3}
+
+    def test_mark_many_merges_flags(self, db_path, multiple_readings):
+        """mark_many should keep flags already set on existing records."""
+        filter_instance = DuplicateFilter(db_path)
+
+        filter_instance.mark_as_uploaded(multiple_readings[0], garmin=True)
+        filter_instance.mark_many(multiple_readings, mqtt=True)
+
+        history = filter_instance.get_history(limit=10)
+        assert len(history) == 3
+        assert filter_instance.get_pending_counts() == {"garmin": 2, "mqtt": 0}
+
+    def test_mark_many_empty(self, db_path):
+        """mark_many with no records should be a no-op."""
+        filter_instance = DuplicateFilter(db_path)
+
+        filter_instance.mark_many([])
+
+        assert filter_instance.get_history() == []
+
     def test_get_history_returns_recent_first(self, db_path, multiple_readings):
         """History should return most recent records first."""
         filter_instance = DuplicateFilter(db_path)
 
-        for reading in multiple_readings:
-            filter_instance.mark_as_uploaded(reading, garmin=True)
+        filter_instance.mark_many(multiple_readings, garmin=True)
 
         history = filter_instance.get_history(limit=10)
         assert len(history) == 3
@@ -118,8 +166,7 @@ class TestDuplicateFilter:
         """History should respect the limit parameter."""
         filter_instance = DuplicateFilter(db_path)
 
-        for reading in multiple_readings:
-            filter_instance.mark_as_uploaded(reading, garmin=True)
+        filter_instance.mark_many(multiple_readings, garmin=True)
 
         history = filter_instance.get_history(limit=2)
         assert len(history) == 2
@@ -139,6 +186,53 @@ class TestDuplicateFilter:
         assert history_user1[0]["user_slot"] == 1
         assert history_user2[0]["user_slot"] == 2
 
+    def test_get_history_selects_columns(self, db_path, sample_reading):
+        """History should return only the requested columns."""
+        filter_instance = DuplicateFilter(db_path)
+        filter_instance.mark_as_uploaded(sample_reading, garmin=True)
+
+        history = filter_instance.get_history(columns=("timestamp", "systolic"))
+
+        assert history == [
+            {"timestamp": sample_reading.timestamp.isoformat(), "systolic": sample_reading.systolic}
+        ]
+
+    def test_get_history_rejects_unknown_columns(self, db_path):
+        """History should reject column names outside the table schema."""
+        filter_instance = DuplicateFilter(db_path)
+
+        with pytest.raises(ValueError, match="Unknown columns"):
+            filter_instance.get_history(columns=("systolic", "1; DROP TABLE uploaded_records"))
+
+    def test_get_history_flags_only(self, db_path, sample_reading, high_bp_reading):
+        """History with flags_only should return only IHB/MOV readings."""
+        filter_instance = DuplicateFilter(db_path)
+        filter_instance.mark_as_uploaded(sample_reading, garmin=True)
+        filter_instance.mark_as_uploaded(high_bp_reading, garmin=True)
+
+        history = filter_instance.get_history(flags_only=True)
+
+        assert [h["record_hash"] for h in history] == [high_bp_reading.record_hash]
+
+    def test_get_history_columns_matches_get_history(self, db_path, multiple_readings):
+        """Column-oriented history should hold the same data as get_history."""
+        filter_instance = DuplicateFilter(db_path)
+        filter_instance.mark_many(multiple_readings, garmin=True)
+
+        rows = filter_instance.get_history(limit=10)
+        columns = filter_instance.get_history_columns(limit=10)
+
+        assert list(columns) == list(rows[0])
+        assert columns == {name: [row[name] for row in rows] for name in columns}
+
+    def test_get_history_columns_empty(self, db_path):
+        """Column-oriented history should keep column names when empty."""
+        filter_instance = DuplicateFilter(db_path)
+
+        columns = filter_instance.get_history_columns(columns=("timestamp", "systolic"))
+
+        assert columns == {"timestamp": [], "systolic": []}
+
     def test_get_statistics_empty_database(self, db_path):
         """Statistics should handle empty database."""
         filter_instance = DuplicateFilter(db_path)
@@ -167,6 +261,34 @@ class TestDuplicateFilter:
         assert stats["last_record"] is not None
         assert stats["avg_systolic"] is not None
 
+    def test_get_statistics_counts_flags(self, db_path, sample_reading, high_bp_reading):
+        """Statistics should count IHB and MOV flags."""
+        filter_instance = DuplicateFilter(db_path)
+
+        filter_instance.mark_as_uploaded(sample_reading, garmin=True)
+        filter_instance.mark_as_uploaded(high_bp_reading, garmin=True)
+
+        stats = filter_instance.get_statistics()
+
+        assert stats["irregular_heartbeat"] == 1
+        assert stats["body_movement"] == 0
+        assert stats["avg_systolic"] == 140.0
+
+    def test_get_statistics_filters_by_date(self, db_path, multiple_readings):
+        """Statistics should only include records within the date range."""
+        filter_instance = DuplicateFilter(db_path)
+
+        filter_instance.mark_many(multiple_readings, garmin=True)
+
+        stats = filter_instance.get_statistics(
+            start_date=datetime(2025, 1, 15, 10, 0, 0),
+            end_date=datetime(2025, 1, 15, 21, 0, 0),
+        )
+
+        assert stats["total_records"] == 2
+        assert stats["first_record"] == "2025-01-15T12:00:00"
+        assert stats["avg_pulse"] == 71.0
+
     def test_get_pending_garmin(self, db_path, multiple_readings):
         """Should return records not uploaded to Garmin."""
         filter_instance = DuplicateFilter(db_path)
@@ -191,12 +313,50 @@ class TestDuplicateFilter:
         pending = filter_instance.get_pending_mqtt()
         assert len(pending) == 2
 
+    def test_pending_queries_use_partial_indexes(self, db_path):
+        """Pending lookups should be served by the partial pending indexes."""
+        filter_instance = DuplicateFilter(db_path)
+
+        with filter_instance._connect() as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone() == (1,)  # NORMAL
+            for column, index in (
+                ("garmin_uploaded", "idx_garmin_pending"),
+                ("mqtt_published", "idx_mqtt_pending"),
+            ):
+                plan = conn.execute(
+                    "EXPLAIN QUERY PLAN SELECT * FROM uploaded_records "
+                    f"WHERE {column} = 0 ORDER BY timestamp ASC LIMIT 10"
+                ).fetchall()
+                assert index in plan[0][-1]
+
+    def test_user_history_uses_composite_index(self, db_path):
+        """Per-user history should be an index range scan without a sort step."""
+        filter_instance = DuplicateFilter(db_path)
+        query, params = filter_instance._history_query(10, 1, None, None, None, False)
+
+        with filter_instance._connect() as conn:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+
+        details = [row[-1] for row in plan]
+        assert any("idx_user_timestamp" in detail for detail in details)
+        assert not any("TEMP B-TREE" in detail for detail in details)
+
+    def test_get_pending_counts(self, db_path, multiple_readings):
+        """Pending counts should match the pending record lists."""
+        filter_instance = DuplicateFilter(db_path)
+        assert filter_instance.get_pending_counts() == {"garmin": 0, "mqtt": 0}
+
+        filter_instance.mark_as_uploaded(multiple_readings[0], garmin=True, mqtt=True)
+        filter_instance.mark_as_uploaded(multiple_readings[1], garmin=False, mqtt=True)
+        filter_instance.mark_as_uploaded(multiple_readings[2], garmin=False, mqtt=False)
+
+        assert filter_instance.get_pending_counts() == {"garmin": 2, "mqtt": 1}
+
     def test_clear_all(self, db_path, multiple_readings):
         """Should clear all records."""
         filter_instance = DuplicateFilter(db_path)
 
-        for reading in multiple_readings:
-            filter_instance.mark_as_uploaded(reading, garmin=True)
+        filter_instance.mark_many(multiple_readings, garmin=True)
 
         deleted = filter_instance.clear_all()
         assert deleted == 3
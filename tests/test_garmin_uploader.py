@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from src.garmin_uploader import GarminUploader
+from src.garmin_uploader import GarminUploader, list_available_tokens
 from src.models import BloodPressureReading
 
 
@@ -74,6 +74,29 @@ class TestGarminUploaderInit:
         assert not uploader.is_logged_in
 
 
+class TestListAvailableTokens:
+    """Tests for list_available_tokens."""
+
+    def test_missing_directory(self, tmp_path):
+        """Missing tokens directory should yield no tokens."""
+        assert list_available_tokens(tmp_path / "nonexistent") == []
+
+    def test_uses_status_fn(self, tmp_path):
+        """Each token folder should be mapped back to its email via status_fn."""
+        (tmp_path / "test_at_example.com").mkdir()
+        (tmp_path / "not-a-token").mkdir()
+        calls = []
+
+        def status_fn(path, email):
+            calls.append((path, email))
+            return {"valid": True}
+
+        tokens = list_available_tokens(tmp_path, status_fn=status_fn)
+
+        assert tokens == [{"valid": True, "email": "test@example.com"}]
+        assert calls == [(tmp_path, "test@example.com")]
+
+
 class TestGarminUploaderLogin:
     """Tests for login functionality."""
 
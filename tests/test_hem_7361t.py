@@ -8,26 +8,14 @@ Tests cover:
 - Record parsing (basic tests)
 """
 
-from dataclasses import dataclass
 from datetime import datetime
 from typing import Literal
 
 import pytest
 
-# ============== MOCK CLASSES ==============
-
+from tests.helpers import MockBloodPressureReading
 
-@dataclass
-class MockBloodPressureReading:
-    """Mock BloodPressureReading for standalone testing."""
-
-    timestamp: datetime
-    systolic: int
-    diastolic: int
-    pulse: int
-    irregular_heartbeat: bool = False
-    body_movement: bool = False
-    user_slot: int = 1
+# ============== MOCK CLASSES ==============
 
 
 class StandaloneHEM7361T:
@@ -1,5 +1,6 @@
 """Tests for src/models.py - BloodPressureReading dataclass."""
 
+import dataclasses
 from datetime import datetime
 
 import pytest
@@ -161,6 +162,20 @@ class TestRecordHash:
         assert "65" in hash_value
         assert "_1" in hash_value  # user_slot
 
+    def test_record_hash_is_cached(self, optimal_reading):
+        """Test hash is computed once and reused."""
+        assert optimal_reading.record_hash is optimal_reading.record_hash
+        assert optimal_reading.__dict__["record_hash"] == optimal_reading.record_hash
+
+    def test_reading_is_immutable(self, optimal_reading):
+        """Test fields can't change under a cached hash; replace() rehashes."""
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            optimal_reading.user_slot = 2
+
+        moved = dataclasses.replace(optimal_reading, user_slot=2)
+        assert moved.record_hash.endswith("_2")
+        assert moved.record_hash != optimal_reading.record_hash
+
     def test_record_hash_uniqueness(self, sample_timestamp):
         """Test different readings produce different hashes."""
         reading1 = BloodPressureReading(